@@ -0,0 +1,4 @@
+"""
+SWP Benchmarks
+Sovereign Workflow Protocol - Performance Measurement Over Synthetic Data
+"""
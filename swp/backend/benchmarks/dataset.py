@@ -0,0 +1,223 @@
+"""
+SWP Benchmark Datasets
+Sovereign Workflow Protocol - Synthetic swp.db Generation
+"""
+
+import json
+import random
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from models.database import ensure_db, init_db, sql_timestamp
+from models.migrations import current_version
+from services.engine import INTENT_MATCHER, BASE_CHECKLISTS
+from services.ledger import archive_path_for
+
+DATASET_SEED = 20260227
+DATASET_SPAN_DAYS = 90          # tasks are spread over this much history
+INSERT_CHUNK = 10000            # rows per executemany / transaction
+
+# (weight, status) of generated tasks
+STATUS_MIX = ((70, "completed"), (5, "failed"), (15, "pending"), (5, "running"), (5, "verification"))
+
+DESCRIPTIONS = (
+    "Scrape the product catalog and extract prices from the crawl",
+    "Implement the billing API endpoint and fix the failing code path",
+    "Recon the staging host: scan open ports with nmap and enumerate subdomains",
+    "Deploy the worker fleet to the server and push the new docker image",
+    "Analyze last week's error logs and summarize the root causes",
+    "Write the weekly report for the Captain",
+    "Build a frontend page for the fleet status dashboard",
+    "Migrate the database schema and backfill the new column",
+)
+
+ERROR_MESSAGES = (
+    ("hallucination", "Claimed /srv/app/config.yml exists but path not found"),
+    ("timeout", "Request timed out after 30s waiting for upstream"),
+    ("permission", "Permission denied: /var/log/nanobot/run.log"),
+    ("network", "Connection refused by 10.0.0.12:8080"),
+    ("syntax", "SyntaxError: unexpected indent in deploy.py"),
+    ("unknown", "Worker exited with status 137"),
+)
+
+PATTERN_TYPES = ("scraping", "coding", "recon", "deployment", "analysis", "general")
+
+
+def dataset_path(data_dir: Path, tasks: int) -> Path:
+    return Path(data_dir) / f"swp_bench_{tasks}.db"
+
+
+def _classified() -> List[Tuple[str, str, str]]:
+    """(description, intent_keywords, checklist JSON) for every template."""
+    rows = []
+    for description in DESCRIPTIONS:
+        match = INTENT_MATCHER.classify(description)
+        checklist = BASE_CHECKLISTS.get(match["task_type"], BASE_CHECKLISTS["general"])
+        rows.append((description, ",".join(match["categories"]), json.dumps(checklist)))
+    return rows
+
+
+def _chunks(rows: Iterator[tuple], size: int = INSERT_CHUNK) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_dataset(path: Path, tasks: int, seed: int = DATASET_SEED) -> Path:
+    """
+    Create a database with `tasks` tasks and the rows a working deployment
+    accumulates around them: tier-3 checklists for every task, plans and
+    context notes for some, execution state for running tasks, ledger
+    entries for failures, and pattern history per category.
+
+    Rows are written with plain SQL in large transactions, so the schema
+    triggers (versions, stats counters) still fire but no engine overhead is
+    paid. Generation is deterministic for a given seed.
+    """
+    path = Path(path)
+    for stale in (path, archive_path_for(path)):
+        stale.unlink(missing_ok=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    init_db(path)
+
+    rng = random.Random(seed)
+    templates = _classified()
+    weights = [w for w, _ in STATUS_MIX]
+    statuses = [s for _, s in STATUS_MIX]
+    now = datetime.now()
+    span = DATASET_SPAN_DAYS * 86400
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    def task_rows():
+        # Oldest first, so ids grow with created_at like real inserts
+        offsets = sorted((rng.random() * span for _ in range(tasks)), reverse=True)
+        for i, offset in enumerate(offsets, 1):
+            description, keywords, checklist = templates[rng.randrange(len(templates))]
+            created = now - timedelta(seconds=offset)
+            status = rng.choices(statuses, weights)[0]
+            finished = (created + timedelta(minutes=rng.uniform(1, 120))).isoformat() \
+                if status in ("completed", "failed") else None
+            yield (i, f"Task {i}: {description[:40]}", description, keywords, status,
+                   checklist, created.isoformat(), finished or created.isoformat(), finished)
+
+    task_meta = []      # (id, status, checklist JSON, created_at)
+    for chunk in _chunks(task_rows()):
+        conn.execute("BEGIN")
+        conn.executemany('''
+            INSERT INTO tasks (id, title, description, intent_keywords, status, checklist,
+                               created_at, updated_at, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', chunk)
+        conn.execute("COMMIT")
+        task_meta.extend((r[0], r[4], r[5], r[6]) for r in chunk)
+
+    def checklist_rows():
+        for task_id, status, checklist, _ in task_meta:
+            done = status == "completed"
+            for i, item in enumerate(json.loads(checklist)):
+                yield (task_id, item, done, i)
+
+    def plan_rows():
+        for task_id, _, _, created in task_meta:
+            if rng.random() < 0.3:
+                yield (task_id, f"Plan for task {task_id}",
+                       "1. Load skill manual\n2. Execute steps\n3. Verify output", "execution", created)
+
+    def context_rows():
+        for task_id, _, _, created in task_meta:
+            if rng.random() < 0.5:
+                yield (task_id, "target", f"host-{rng.randrange(256)}.fleet.local", created)
+                yield (task_id, "notes", "Captain asked for a short summary", created)
+
+    def state_rows():
+        for task_id, status, checklist, created in task_meta:
+            if status == "running":
+                step = rng.randrange(len(json.loads(checklist)))
+                yield (task_id, f"step-{step}", step, f"step-{step}", sql_timestamp(now.timestamp()))
+
+    def ledger_rows():
+        for task_id, status, _, created in task_meta:
+            if status == "failed" or rng.random() < 0.05:
+                root_cause, message = ERROR_MESSAGES[rng.randrange(len(ERROR_MESSAGES))]
+                resolved = rng.random() < 0.5
+                yield (task_id, "execution_error", message, root_cause, "Apply the rule's correction",
+                       resolved, created if resolved else None, created)
+
+    tables = (
+        ("INSERT INTO memory_tier3_checklists (task_id, checklist_item, completed, order_index) "
+         "VALUES (?, ?, ?, ?)", checklist_rows),
+        ("INSERT INTO memory_tier1_plans (task_id, title, plan_content, phase, created_at) "
+         "VALUES (?, ?, ?, ?, ?)", plan_rows),
+        ("INSERT INTO memory_tier2_context (task_id, context_key, context_value, updated_at) "
+         "VALUES (?, ?, ?, ?)", context_rows),
+        ("INSERT INTO execution_state (task_id, current_step, step_index, last_resume_point, last_heartbeat) "
+         "VALUES (?, ?, ?, ?, ?)", state_rows),
+        ("INSERT INTO disciplinary_ledger (task_id, error_type, error_message, root_cause, "
+         "correction_action, resolved, resolved_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", ledger_rows),
+    )
+    for sql, rows in tables:
+        for chunk in _chunks(rows()):
+            conn.execute("BEGIN")
+            conn.executemany(sql, chunk)
+            conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    # Patterns and the ledger archive go through the engine's own code paths
+    from services.engine import SWPEngine
+    engine = SWPEngine(path, state_flush_interval=0)
+    try:
+        for _ in range(min(tasks // 10, 5000)):
+            engine.record_pattern(rng.choice(PATTERN_TYPES), rng.lognormvariate(2.5, 0.8),
+                                  rng.random() < 0.85, [])
+        engine.archive_disciplinary_records()
+    finally:
+        engine.close()
+    return path
+
+
+def ensure_dataset(data_dir: Path, tasks: int, rebuild: bool = False) -> Path:
+    """Build the dataset once and reuse it while the schema version is unchanged."""
+    path = dataset_path(data_dir, tasks)
+    if not rebuild and path.exists():
+        conn = sqlite3.connect(path)
+        try:
+            ready = current_version(conn) > 0 and \
+                conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] >= tasks
+        finally:
+            conn.close()
+        if ready:
+            ensure_db(path)         # migrates older datasets forward
+            return path
+    return build_dataset(path, tasks)
+
+
+def working_copy(source: Path, target: Path) -> Path:
+    """Copy a dataset (and its ledger archive) so a run's writes never touch the original."""
+    for src, dst in ((source, target), (archive_path_for(source), archive_path_for(target))):
+        for suffix in ("-wal", "-shm"):
+            Path(f"{dst}{suffix}").unlink(missing_ok=True)
+        if src.exists():
+            shutil.copyfile(src, dst)
+        else:
+            dst.unlink(missing_ok=True)
+    return target
+
+
+def discard_copy(target: Path):
+    """Remove a working copy made by working_copy()."""
+    for path in (target, archive_path_for(target)):
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
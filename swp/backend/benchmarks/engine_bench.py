@@ -0,0 +1,242 @@
+"""
+SWP Engine Benchmarks
+Sovereign Workflow Protocol - SWPEngine Micro-Benchmarks with a Regression Baseline
+
+Usage (from swp/backend):
+    python -m benchmarks.engine_bench                      # 10k and 100k, compare to baseline
+    python -m benchmarks.engine_bench --sizes 1m --ops list_tasks,get_task_memory
+    python -m benchmarks.engine_bench --update-baseline    # record the current numbers
+
+Exits 1 when an operation is slower than its baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.dataset import (ensure_dataset, working_copy, discard_copy, DESCRIPTIONS,
+                                ERROR_MESSAGES, PATTERN_TYPES)
+from benchmarks.stats import summarize
+from services.engine import SWPEngine
+from services.events import EventBus
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DATA_DIR = Path(tempfile.gettempdir()) / "swp-bench"
+
+DEFAULT_SIZES = (10_000, 100_000)
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+REGRESSION_TOLERANCE = 0.30     # fail when ops/sec drops or p95 grows by more than this fraction
+WARMUP_CALLS = 5
+MAX_CALLS = 2000                # per operation
+TIME_BUDGET_SECONDS = 5.0       # per operation; slow operations stop early
+MIN_CALLS = 5
+STATE_FLUSH_BATCH = 100         # distinct tasks saved per flush interval on a busy fleet
+
+VERIFY_OUTPUT = (
+    "Checked /srv/app/main.py and the health endpoint.\n"
+    "All steps completed; the service answers 200 OK.\n"
+) * 20
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def size_label(tasks: int) -> str:
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda kv: -kv[1]):
+        if tasks >= factor and tasks % factor == 0:
+            return f"{tasks // factor}{suffix}"
+    return str(tasks)
+
+
+class Operations:
+    """One callable per benchmarked engine method, fed with random but valid arguments."""
+
+    def __init__(self, engine: SWPEngine, rng: random.Random):
+        self.engine = engine
+        self.rng = rng
+        with engine.db.read() as c:
+            c.execute("SELECT MAX(id) FROM tasks")
+            self.max_id = c.fetchone()[0] or 1
+        self.step = 0
+
+    def task_id(self) -> int:
+        return self.rng.randint(1, self.max_id)
+
+    def create_task(self):
+        self.engine.create_task("Benchmark task", self.rng.choice(DESCRIPTIONS))
+
+    def list_tasks(self):
+        self.engine.list_tasks(self.rng.choice((None, "pending", "running")))
+
+    def get_task_memory(self):
+        self.engine.get_task_memory(self.task_id())
+
+    def verify_task(self):
+        self.engine.verify_task(self.task_id(), VERIFY_OUTPUT)
+
+    def perform_rca(self):
+        self.engine.perform_rca(self.task_id(), self.rng.choice(ERROR_MESSAGES)[1])
+
+    def record_pattern(self):
+        self.engine.record_pattern(self.rng.choice(PATTERN_TYPES), self.rng.lognormvariate(2.5, 0.8),
+                                   self.rng.random() < 0.85, [])
+
+    def save_execution_state(self):
+        """The caller's cost only: the save lands in the write-behind buffer."""
+        self.step += 1
+        self.engine.save_execution_state(self.task_id(), f"step-{self.step % 7}", self.step % 7)
+
+    def flush_execution_state(self):
+        """The database side of saves: one buffer flush of STATE_FLUSH_BATCH tasks."""
+        self.step += 1
+        for _ in range(STATE_FLUSH_BATCH):
+            self.engine.save_execution_state(self.task_id(), f"step-{self.step % 7}", self.step % 7)
+        self.engine.flush_execution_state()
+
+
+OPERATIONS = ("create_task", "list_tasks", "get_task_memory", "verify_task",
+              "perform_rca", "record_pattern", "save_execution_state", "flush_execution_state")
+
+
+def measure(fn: Callable[[], Any], max_calls: int = MAX_CALLS,
+            budget: float = TIME_BUDGET_SECONDS) -> Dict[str, Any]:
+    for _ in range(WARMUP_CALLS):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_calls:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= MIN_CALLS and time.perf_counter() - started > budget:
+            break
+    total = sum(samples)
+    return {"ops_per_sec": round(len(samples) / total, 1) if total else 0.0, **summarize(samples)}
+
+
+def run_size(tasks: int, ops: List[str], data_dir: Path, rebuild: bool = False,
+             max_calls: int = MAX_CALLS, budget: float = TIME_BUDGET_SECONDS) -> Dict[str, Dict]:
+    """Benchmark `ops` against a fresh copy of the `tasks`-sized dataset."""
+    started = time.perf_counter()
+    source = ensure_dataset(data_dir, tasks, rebuild)
+    print(f"📦 Dataset {size_label(tasks)}: {source} ({time.perf_counter() - started:.1f}s)")
+    target = working_copy(source, source.with_name(f"{source.stem}_run{source.suffix}"))
+
+    engine = SWPEngine(target, events=EventBus())
+    try:
+        operations = Operations(engine, random.Random(tasks))
+        results = {}
+        for op in ops:
+            results[op] = measure(getattr(operations, op), max_calls, budget)
+            r = results[op]
+            print(f"  {op:<22} {r['ops_per_sec']:>10.1f} ops/s   p50 {r['p50_ms']:>9.3f}ms   "
+                  f"p95 {r['p95_ms']:>9.3f}ms   p99 {r['p99_ms']:>9.3f}ms   ({r['calls']} calls)")
+        return results
+    finally:
+        engine.close()
+        discard_copy(target)
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {"environment": {}, "results": {}}
+    return json.loads(path.read_text())
+
+
+def compare(results: Dict[str, Dict[str, Dict]], baseline: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """Regressions of `results` against `baseline`, one message each."""
+    regressions = []
+    for size, ops in results.items():
+        for op, current in ops.items():
+            base = baseline.get("results", {}).get(size, {}).get(op)
+            if not base:
+                continue
+            if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+                regressions.append(f"{size} {op}: {current['ops_per_sec']} ops/s "
+                                   f"vs baseline {base['ops_per_sec']}")
+            if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{size} {op}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SWPEngine micro-benchmarks")
+    parser.add_argument("--sizes", default=",".join(size_label(s) for s in DEFAULT_SIZES),
+                        help="comma-separated task counts, e.g. 10k,100k,1m")
+    parser.add_argument("--ops", default=",".join(OPERATIONS), help="comma-separated operations")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="where datasets are cached")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate cached datasets")
+    parser.add_argument("--max-calls", type=int, default=MAX_CALLS)
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET_SECONDS,
+                        help="seconds per operation before it stops early")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help=f"allowed slowdown fraction (default: baseline's, else {REGRESSION_TOLERANCE})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write these results into the baseline instead of comparing")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    ops = [op.strip() for op in args.ops.split(",") if op.strip()]
+    unknown = [op for op in ops if op not in OPERATIONS]
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(unknown)} (choose from {', '.join(OPERATIONS)})")
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    results = {}
+    for tasks in sizes:
+        results[size_label(tasks)] = run_size(tasks, ops, args.data_dir, args.rebuild,
+                                              args.max_calls, args.budget)
+    if args.json:
+        args.json.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        for size, ops_results in results.items():
+            baseline["results"].setdefault(size, {}).update(ops_results)
+        baseline["environment"] = environment()
+        baseline.setdefault("tolerance", REGRESSION_TOLERANCE)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"📝 Baseline updated: {args.baseline}")
+        return 0
+
+    if baseline.get("environment") and baseline["environment"] != environment():
+        print(f"⚠️ Baseline was recorded on {baseline['environment']}, this run is {environment()}")
+    tolerance = args.tolerance if args.tolerance is not None else baseline.get("tolerance", REGRESSION_TOLERANCE)
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print(f"✅ No regressions beyond {tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+SWP HTTP Load Test
+Sovereign Workflow Protocol - Route-Mix Load Generator for the FastAPI App
+
+Usage (from swp/backend, after pip install -r ../requirements-bench.txt):
+    python -m benchmarks.http_load                                   # in-process, temp database
+    python -m benchmarks.http_load --concurrency 64 --duration 30 --mix read=8,state=4,verify=1
+    python -m benchmarks.http_load --url http://127.0.0.1:8080       # a running uvicorn
+
+In-process runs drive main.app through httpx's ASGI transport with the app's
+lifespan running, against a temporary database (or --db). Client and server
+share one event loop, so absolute numbers are lower than against uvicorn;
+use them to compare changes. Live runs create tasks on the target server;
+point them at a local instance, never at the fleet's.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.stats import summarize
+
+DEFAULT_MIX = "create=1,read=6,list=1,verify=1,rca=1,state=3,resume=1"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_DURATION_SECONDS = 10.0
+SEED_TASKS = 1000               # created before the clock starts so reads have targets
+SEED_BATCH = 500
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+DESCRIPTIONS = (
+    "Scrape the product catalog and extract prices",
+    "Implement the billing API endpoint and fix the failing code",
+    "Recon the staging host: scan open ports and enumerate subdomains",
+    "Deploy the worker fleet to the server",
+    "Write the weekly report for the Captain",
+)
+ERRORS = (
+    "Claimed /srv/app/config.yml exists but path not found",
+    "Request timed out after 30s waiting for upstream",
+    "Permission denied: /var/log/nanobot/run.log",
+    "Connection refused by 10.0.0.12:8080",
+)
+OUTPUT = "Checked /srv/app/main.py and the health endpoint. All steps completed; the service answers 200 OK.\n" * 10
+
+
+class LoadContext:
+    """Shared state of one run: known task ids and a seeded RNG."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.task_ids: List[int] = []
+        self.steps = 0
+
+    def task_id(self) -> int:
+        return self.rng.choice(self.task_ids)
+
+
+# name -> (route label, request builder). A builder returns (method, url, request kwargs).
+Request = Tuple[str, str, Dict[str, Any]]
+SCENARIOS: Dict[str, Tuple[str, Callable[[LoadContext], Request]]] = {
+    "create": ("POST /api/tasks", lambda ctx: (
+        "POST", "/api/tasks",
+        {"json": {"title": "Load test task", "description": ctx.rng.choice(DESCRIPTIONS)}})),
+    "read": ("GET /api/tasks/{task_id}", lambda ctx: (
+        "GET", f"/api/tasks/{ctx.task_id()}", {})),
+    "list": ("GET /api/tasks", lambda ctx: (
+        "GET", "/api/tasks", {"params": {"limit": 50, "fields": "id,title,status"}})),
+    "verify": ("POST /api/verify", lambda ctx: (
+        "POST", "/api/verify", {"json": {"task_id": ctx.task_id(), "output": OUTPUT}})),
+    "rca": ("POST /api/rca", lambda ctx: (
+        "POST", "/api/rca", {"json": {"task_id": ctx.task_id(), "error_message": ctx.rng.choice(ERRORS)}})),
+    "state": ("POST /api/state/{task_id}/save", lambda ctx: (
+        "POST", f"/api/state/{ctx.task_id()}/save",
+        {"params": {"current_step": f"step-{ctx.steps % 7}", "step_index": ctx.steps % 7}})),
+    "resume": ("GET /api/state/{task_id}/resume", lambda ctx: (
+        "GET", f"/api/state/{ctx.task_id()}/resume", {})),
+}
+
+# Expected non-2xx answers, not errors: a task without saved state has nothing to resume
+EXPECTED_STATUS = {"resume": {404}}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'read=6,state=3' -> weights. Raises ValueError for unknown scenarios."""
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the mix needs at least one scenario with a positive weight")
+    return mix
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: str, error: bool):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error:
+            self.errors += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        requests = len(self.latencies)
+        return {
+            "requests": requests,
+            "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            **{k: v for k, v in summarize(self.latencies).items() if k != "calls"},
+        }
+
+
+async def seed_tasks(client: httpx.AsyncClient, ctx: LoadContext, count: int):
+    for start in range(0, count, SEED_BATCH):
+        batch = [{"title": f"Seed task {i}", "description": ctx.rng.choice(DESCRIPTIONS)}
+                 for i in range(start, min(count, start + SEED_BATCH))]
+        response = await client.post("/api/tasks/batch", json={"tasks": batch})
+        response.raise_for_status()
+        ctx.task_ids.extend(response.json()["task_ids"])
+
+
+async def run_load(client: httpx.AsyncClient, mix: Dict[str, float], concurrency: int,
+                   duration: float, ctx: LoadContext,
+                   max_requests: Optional[int] = None) -> Dict[str, Any]:
+    """Drive `concurrency` closed-loop clients for `duration` seconds (or max_requests)."""
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    stats: Dict[str, RouteStats] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop():
+        nonlocal issued
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            name = ctx.rng.choices(names, weights)[0]
+            label, build = SCENARIOS[name]
+            ctx.steps += 1
+            method, url, kwargs = build(ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+                error = response.status_code >= 400 and response.status_code not in EXPECTED_STATUS.get(name, ())
+                if name == "create" and response.status_code == 200:
+                    ctx.task_ids.append(response.json()["task_id"])
+            except httpx.HTTPError as e:
+                status, error = type(e).__name__, True
+            stats.setdefault(label, RouteStats()).record(time.perf_counter() - started, status, error)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    routes = {label: s.report(elapsed) for label, s in sorted(stats.items())}
+    total = RouteStats()
+    for s in stats.values():
+        total.latencies.extend(s.latencies)
+        total.errors += s.errors
+        for status, n in s.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + n
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+        "mix": mix,
+        "routes": routes,
+        "total": total.report(elapsed),
+    }
+
+
+@asynccontextmanager
+async def in_process_client(db_path: Path) -> AsyncIterator[httpx.AsyncClient]:
+    """main.app over httpx's ASGI transport, with the app's lifespan running."""
+    # Must be set before the first import of the engine binds the default DB path
+    os.environ["SWP_DB_PATH"] = str(db_path)
+    from main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://swp.local",
+                                     timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            yield client
+
+
+@asynccontextmanager
+async def live_client(url: str, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=REQUEST_TIMEOUT_SECONDS) as client:
+        yield client
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\n{'route':<34} {'req':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for label, r in rows:
+        if not r["requests"]:
+            continue
+        print(f"{label:<34} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['error_rate']:>7.2%}")
+    print(f"\n{result['concurrency']} clients for {result['elapsed_seconds']}s")
+
+
+async def main_async(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    ctx = LoadContext(args.seed)
+    if args.url:
+        client_cm = live_client(args.url, args.concurrency)
+    else:
+        db_path = args.db or Path(tempfile.mkdtemp(prefix="swp-load-")) / "swp.db"
+        print(f"🗄️ In-process run against {db_path}")
+        client_cm = in_process_client(db_path)
+
+    async with client_cm as client:
+        await seed_tasks(client, ctx, args.seed_tasks)
+        print(f"🌱 Seeded {len(ctx.task_ids)} tasks; running {args.concurrency} clients "
+              f"for {args.duration}s with mix {mix}")
+        return await run_load(client, mix, args.concurrency, args.duration, ctx, args.requests)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SWP HTTP load test")
+    parser.add_argument("--url", help="base URL of a running server; default is in-process")
+    parser.add_argument("--db", type=Path, help="database for in-process runs (default: a new temp file)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SECONDS)
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--seed-tasks", type=int, default=SEED_TASKS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="exit 1 when the overall error rate is above this fraction")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.seed_tasks < 1:
+        parser.error("--seed-tasks must be at least 1")
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+    if args.max_error_rate is not None and result["total"]["error_rate"] > args.max_error_rate:
+        print(f"❌ Error rate {result['total']['error_rate']:.2%} above {args.max_error_rate:.2%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+SWP Benchmark Statistics
+Sovereign Workflow Protocol - Latency Sample Summaries
+"""
+
+from typing import Any, Dict, List
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_samples) - 1, int(round(q * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Call count, mean and p50/p95/p99/max in milliseconds for durations in seconds."""
+    if not samples:
+        return {"calls": 0}
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 4),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
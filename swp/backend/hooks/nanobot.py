@@ -4,7 +4,9 @@ Pre-Task & Post-Task Mandatory Hooks
 """
 
 import sys
-from .services.engine import SWPEngine
+from typing import Dict, List, Optional
+from services.engine import get_engine
+from services.metrics import count_hook
 
 # === PRE-TASK HOOK ===
 def pre_task_hook(task_description: str) -> dict:
@@ -12,7 +14,8 @@ def pre_task_hook(task_description: str) -> dict:
     MANDATORY: Must be called before any Nanobot task execution.
     Loads relevant skill manual and prepares execution context.
     """
-    engine = SWPEngine()
+    count_hook("pre_task")
+    engine = get_engine()
     
     # 1. Load relevant skill manual
     manual = engine.load_skill_manual(task_description)
@@ -20,23 +23,31 @@ def pre_task_hook(task_description: str) -> dict:
     # 2. Parse intent for checklist generation
     intent = engine.parse_intent(task_description)
     
+    # 3. Other manuals that match the task text, across categories
+    related = engine.related_skill_manuals(task_description)
+    
     return {
         "hook": "pre_task",
         "skill_manual": manual,
+        "related_manuals": related,
         "intent": intent,
         "status": "ready_to_execute"
     }
 
 # === POST-TASK HOOK ===
-def post_task_hook(task_id: int, output: str) -> dict:
+def post_task_hook(task_id: int, output: str, targets: Optional[Dict[str, List[str]]] = None) -> dict:
     """
     MANDATORY: Must be called after task completion but before output finalization.
-    Performs verification and self-audit.
+    Performs verification and self-audit. `targets` optionally names protocol
+    checks to triple-check the output's claims against (see VERIFICATION_PROTOCOLS).
     """
-    engine = SWPEngine()
+    count_hook("post_task")
+    engine = get_engine()
     
     # 1. Verification (anti-hallucination)
     verification = engine.verify_task(task_id, output)
+    if targets:
+        verification["protocols"] = engine.verify_protocols(task_id, targets)
     
     # 2. If verification fails, trigger RCA
     if not verification["verified"]:
@@ -60,7 +71,8 @@ def error_hook(task_id: int, error_message: str) -> dict:
     Called when an error occurs during execution.
     Triggers Root Cause Analysis and self-correction.
     """
-    engine = SWPEngine()
+    count_hook("error")
+    engine = get_engine()
     
     # Perform RCA
     rca_result = engine.perform_rca(task_id, error_message)
@@ -74,12 +86,14 @@ def error_hook(task_id: int, error_message: str) -> dict:
 # === STATE MANAGEMENT HOOKS ===
 def save_state_hook(task_id: int, current_step: str, step_index: int):
     """Save execution state for long-running tasks."""
-    engine = SWPEngine()
+    count_hook("save_state")
+    engine = get_engine()
     engine.save_execution_state(task_id, current_step, step_index)
 
 def resume_state_hook(task_id: int) -> dict:
     """Resume from last saved state."""
-    engine = SWPEngine()
+    count_hook("resume_state")
+    engine = get_engine()
     state = engine.load_execution_state(task_id)
     if not state:
         return {"can_resume": False}
@@ -101,7 +115,7 @@ if __name__ == "__main__":
     print(f"   Checklist: {len(pre_result['intent']['checklist'])} items")
     
     # Create task in DB
-    engine = SWPEngine()
+    engine = get_engine()
     task_id = engine.create_task("Build API", "Build a Python API with FastAPI")
     print(f"\n2. Created Task #{task_id}")
     
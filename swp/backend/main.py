@@ -13,13 +13,16 @@ if str(BACKEND_DIR) not in sys.path:
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes.main import app as routes_app
+from fastapi.responses import Response
+from routes.main import app as routes_app, lifespan, engine
+from services.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE
 
-# Create main app
+# Create main app (mounted apps don't get lifespan events, so run the routes' here)
 app = FastAPI(
     title="Sovereign Workflow Protocol",
     description="AI Agent Management & Orchestration System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -30,13 +33,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount sub-application
-app.mount("/", routes_app)
+# Outermost, so it also times CORS handling and the mounted app
+app.add_middleware(MetricsMiddleware)
 
+# Own routes first: the "/" mount below matches every path
 @app.get("/health")
 def health():
     return {"status": "operational", "system": "SWP"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format: HTTP, SQLite and hook metrics plus task gauges."""
+    return Response(render_metrics(await engine.get_stats()), media_type=CONTENT_TYPE)
+
+# Mount sub-application
+app.mount("/", routes_app)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
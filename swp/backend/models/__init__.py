@@ -1,4 +1,6 @@
 # SWP Backend Models
-from .database import init_db
+from .database import init_db, ensure_db, is_db_ready
+from .connection import ConnectionManager
+from .migrations import migrate, SCHEMA_VERSION
 
-__all__ = ["init_db"]
+__all__ = ["init_db", "ensure_db", "is_db_ready", "ConnectionManager", "migrate", "SCHEMA_VERSION"]
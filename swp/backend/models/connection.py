@@ -0,0 +1,176 @@
+"""
+SWP Connection Manager
+Sovereign Workflow Protocol - Shared SQLite Connections
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Union
+
+# === CONNECTION TUNING ===
+BUSY_TIMEOUT_MS = 5000          # wait for the writer lock instead of failing with "database is locked"
+CACHE_SIZE_KIB = 16384          # page cache per connection (16 MiB)
+STATEMENT_CACHE_SIZE = 256      # prepared statements kept per connection
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",         # readers never block the writer
+    "PRAGMA synchronous = NORMAL",       # safe with WAL, avoids an fsync per commit
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class _ThreadConnection:
+    """Thread-local holder; when its thread exits it is collected and a finalizer closes the connection."""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class ConnectionManager:
+    """
+    Thread-local SQLite connections shared by every engine method.
+    Each thread opens one tuned connection and keeps it (and its prepared
+    statement cache) while the thread lives; it is closed when the thread
+    exits, so short-lived hook and executor threads don't leak connections.
+    """
+
+    def __init__(self, db_path: Union[str, Path], observer: Optional[Any] = None):
+        self.db_path = Path(db_path)
+        # Optional timing sink with lock_wait(method, s), query(method, kind, s) and commit(method, s)
+        self.observer = observer
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,        # explicit BEGIN/COMMIT only
+            check_same_thread=False,     # close_all() runs from another thread
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = self._connect()
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.append(conn)
+            weakref.finalize(holder, self._release, self._lock, self._connections, conn)
+            return conn
+        return holder.conn
+
+    @staticmethod
+    def _release(lock: threading.Lock, connections: List[sqlite3.Connection], conn: sqlite3.Connection):
+        """Finalizer of a thread's holder; takes no reference to the manager so it can't keep it alive."""
+        with lock:
+            if conn in connections:
+                connections.remove(conn)
+        conn.close()
+
+    @staticmethod
+    def _caller() -> str:
+        """Qualified name of the function that opened the block (frames: here, generator, __enter__)."""
+        code = sys._getframe(3).f_code
+        return getattr(code, "co_qualname", code.co_name)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """Cursor for autocommit reads."""
+        cursor = self.connection().cursor()
+        observer = self.observer
+        if observer is not None:
+            method, started = self._caller(), time.perf_counter()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            if observer is not None:
+                observer.query(method, "read", time.perf_counter() - started)
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Read transaction: every query inside sees the same WAL snapshot.
+        Nested calls join the outer transaction.
+        """
+        conn = self.connection()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        observer = self.observer
+        if observer is not None:
+            method, started = self._caller(), time.perf_counter()
+        cursor.execute("BEGIN")
+        try:
+            yield cursor
+        finally:
+            conn.commit()
+            cursor.close()
+            if observer is not None:
+                observer.query(method, "snapshot", time.perf_counter() - started)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Write transaction. BEGIN IMMEDIATE takes the writer lock up front so
+        concurrent writers queue on busy_timeout instead of deadlocking on upgrade.
+        Nested calls join the outer transaction.
+        """
+        conn = self.connection()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        observer = self.observer
+        if observer is not None:
+            method, started = self._caller(), time.perf_counter()
+        cursor.execute("BEGIN IMMEDIATE")
+        if observer is not None:
+            locked = time.perf_counter()
+            observer.lock_wait(method, locked - started)
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            if observer is not None:
+                done = time.perf_counter()
+                observer.query(method, "write", done - locked)
+            conn.commit()
+            if observer is not None:
+                observer.commit(method, time.perf_counter() - done)
+        finally:
+            cursor.close()
+
+    def close_all(self):
+        """Close every connection opened by this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -3,16 +3,27 @@ SWP Database Schema
 Sovereign Workflow Protocol - Persistent Storage
 """
 
+import os
 import sqlite3
 import json
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-DB_PATH = Path(__file__).parent.parent / "data" / "swp.db"
+from .migrations import migrate, current_version, SCHEMA_VERSION, SQLITE_TIMESTAMP_FORMAT
 
-def init_db():
+# SWP_DB_PATH points a process (e.g. a load test) at another database
+DB_PATH = Path(os.environ.get("SWP_DB_PATH") or Path(__file__).parent.parent / "data" / "swp.db")
+
+def sql_timestamp(epoch: Optional[float] = None) -> str:
+    """UTC time (default now) in CURRENT_TIMESTAMP's format, so it compares with column defaults."""
+    return time.strftime(SQLITE_TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+def init_db(db_path: Path = DB_PATH):
     """Initialize all SWP tables."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     c = conn.cursor()
     
     # === SKILL MANUALS ===
@@ -121,8 +132,37 @@ def init_db():
     ''')
     
     conn.commit()
+    
+    # === VERSIONED UPGRADES (indexes, schema changes) ===
+    version = migrate(conn)
     conn.close()
-    print(f"✅ SWP Database initialized at {DB_PATH}")
+    print(f"✅ SWP Database initialized at {db_path} (schema v{version})")
+
+# === ONE-TIME INITIALIZATION ===
+_ready_paths = set()
+_init_lock = threading.Lock()
+
+def is_db_ready(db_path: Path = DB_PATH) -> bool:
+    """Cheap readiness check: database exists and is at the latest schema version."""
+    if not Path(db_path).exists():
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        return current_version(conn) >= SCHEMA_VERSION
+    finally:
+        conn.close()
+
+def ensure_db(db_path: Path = DB_PATH):
+    """Initialize the schema at most once per process; later calls are a set lookup."""
+    key = str(Path(db_path).resolve())
+    if key in _ready_paths:
+        return
+    with _init_lock:
+        if key in _ready_paths:
+            return
+        if not is_db_ready(db_path):
+            init_db(db_path)
+        _ready_paths.add(key)
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,365 @@
+"""
+SWP Schema Migrations
+Sovereign Workflow Protocol - Versioned Schema Upgrades
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, List, Sequence, Tuple, Union
+
+from .sketch import bucket_key, merge
+
+# A step is either a sequence of SQL statements or a callable taking a cursor.
+MigrationStep = Union[Sequence[str], Callable[[sqlite3.Cursor], None]]
+
+# CURRENT_TIMESTAMP's format; always UTC
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# === DATA MIGRATIONS ===
+def _unique_execution_patterns(c: sqlite3.Cursor):
+    """
+    Fold duplicate execution_patterns rows into one per pattern_type, backfill
+    success_count, and seed each duration sketch from the stored mean (the
+    only duration history there is), weighted by execution_count.
+    """
+    c.execute("ALTER TABLE execution_patterns ADD COLUMN success_count INTEGER NOT NULL DEFAULT 0")
+    c.execute("ALTER TABLE execution_patterns ADD COLUMN duration_sketch TEXT")
+
+    merged = {}
+    c.execute('''
+        SELECT id, pattern_type, avg_duration_minutes, success_rate, execution_count, common_errors, last_used
+        FROM execution_patterns ORDER BY last_used, id
+    ''')
+    for row_id, pattern_type, avg, rate, count, errors, last_used in c.fetchall():
+        count = count or 0
+        sketch = {bucket_key(avg): count} if avg is not None and count else {}
+        entry = merged.setdefault(pattern_type, {
+            "id": row_id, "count": 0, "successes": 0, "total_minutes": 0.0, "sketch": {},
+        })
+        entry["count"] += count
+        entry["successes"] += round((rate or 0.0) * count)
+        entry["total_minutes"] += (avg or 0.0) * count
+        entry["sketch"] = merge([entry["sketch"], sketch])
+        # Rows are in last_used order, so the newest row's errors win
+        entry["errors"], entry["last_used"] = errors, last_used
+
+    keep = [entry["id"] for entry in merged.values()]
+    c.execute(
+        f"DELETE FROM execution_patterns WHERE id NOT IN ({','.join('?' * len(keep))})", keep
+    )
+    for entry in merged.values():
+        count = entry["count"]
+        c.execute('''
+            UPDATE execution_patterns
+            SET execution_count = ?, success_count = ?, success_rate = ?,
+                avg_duration_minutes = ?, duration_sketch = ?, common_errors = ?, last_used = ?
+            WHERE id = ?
+        ''', (
+            count, entry["successes"], entry["successes"] / count if count else None,
+            entry["total_minutes"] / count if count else None, json.dumps(entry["sketch"]),
+            entry["errors"], entry["last_used"], entry["id"]
+        ))
+
+    # record_pattern upserts on pattern_type
+    c.execute("DROP INDEX IF EXISTS idx_patterns_type")
+    c.execute("CREATE UNIQUE INDEX idx_patterns_type ON execution_patterns(pattern_type)")
+
+def _utc_heartbeats(c: sqlite3.Cursor):
+    """
+    Rewrite heartbeats stored as local-time isoformat in CURRENT_TIMESTAMP's
+    UTC format, so they compare with the column default and across hosts.
+    Naive values are taken as this host's local time, which is what wrote them.
+    """
+    c.execute("SELECT task_id, last_heartbeat FROM execution_state WHERE last_heartbeat LIKE '%T%'")
+    rows = []
+    for task_id, stamp in c.fetchall():
+        try:
+            utc = datetime.fromisoformat(stamp).astimezone(timezone.utc)
+        except ValueError:
+            continue
+        rows.append((utc.strftime(SQLITE_TIMESTAMP_FORMAT), task_id))
+    c.executemany("UPDATE execution_state SET last_heartbeat = ? WHERE task_id = ?", rows)
+
+
+# === ORDERED MIGRATIONS ===
+# Append only. Never edit a migration once it has shipped.
+MIGRATIONS: List[Tuple[int, str, MigrationStep]] = [
+    (1, "hot-path indexes", (
+        # list_tasks: filter on status, newest first
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at)",
+        # get_task_memory: every tier is read by task_id
+        "CREATE INDEX IF NOT EXISTS idx_tier1_task ON memory_tier1_plans(task_id)",
+        # save_memory_tier2 uses INSERT OR REPLACE, which needs a key to replace on
+        '''DELETE FROM memory_tier2_context WHERE id NOT IN (
+               SELECT MAX(id) FROM memory_tier2_context GROUP BY task_id, context_key
+           )''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tier2_task_key ON memory_tier2_context(task_id, context_key)",
+        "CREATE INDEX IF NOT EXISTS idx_tier3_task_order ON memory_tier3_checklists(task_id, order_index)",
+        # get_disciplinary_records: by task, or newest first
+        "CREATE INDEX IF NOT EXISTS idx_ledger_task ON disciplinary_ledger(task_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ledger_created ON disciplinary_ledger(created_at)",
+        # load_skill_manual: newest manual in a category
+        "CREATE INDEX IF NOT EXISTS idx_skill_category_updated ON skill_manuals(category, updated_at)",
+        "CREATE INDEX IF NOT EXISTS idx_patterns_type ON execution_patterns(pattern_type)",
+    )),
+    (2, "task version counter", (
+        # Bumped on every change to a task's view; used for ETags
+        "ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0",
+        # Any UPDATE on a task row bumps it unless the statement already did
+        '''CREATE TRIGGER IF NOT EXISTS trg_tasks_version AFTER UPDATE ON tasks
+           WHEN NEW.version = OLD.version
+           BEGIN
+               UPDATE tasks SET version = OLD.version + 1 WHERE id = NEW.id;
+           END''',
+    )),
+    (3, "skill manual full-text index", (
+        # External-content FTS5 table: the text lives in skill_manuals only
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS skill_manuals_fts USING fts5(
+               name, category, content, keywords,
+               content='skill_manuals', content_rowid='id',
+               tokenize='unicode61 remove_diacritics 2'
+           )''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_fts_insert AFTER INSERT ON skill_manuals BEGIN
+               INSERT INTO skill_manuals_fts(rowid, name, category, content, keywords)
+               VALUES (NEW.id, NEW.name, NEW.category, NEW.content, NEW.keywords);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_fts_delete AFTER DELETE ON skill_manuals BEGIN
+               INSERT INTO skill_manuals_fts(skill_manuals_fts, rowid, name, category, content, keywords)
+               VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.content, OLD.keywords);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_fts_update AFTER UPDATE ON skill_manuals BEGIN
+               INSERT INTO skill_manuals_fts(skill_manuals_fts, rowid, name, category, content, keywords)
+               VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.content, OLD.keywords);
+               INSERT INTO skill_manuals_fts(rowid, name, category, content, keywords)
+               VALUES (NEW.id, NEW.name, NEW.category, NEW.content, NEW.keywords);
+           END''',
+        "INSERT INTO skill_manuals_fts(skill_manuals_fts) VALUES ('rebuild')",
+    )),
+    (4, "cache generation counters", (
+        # Lets in-process caches notice writes made by other processes
+        '''CREATE TABLE IF NOT EXISTS cache_generations (
+               name TEXT PRIMARY KEY,
+               generation INTEGER NOT NULL DEFAULT 0
+           ) WITHOUT ROWID''',
+        "INSERT OR IGNORE INTO cache_generations (name, generation) VALUES ('skill_manuals', 0)",
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_gen_insert AFTER INSERT ON skill_manuals BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'skill_manuals';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_gen_update AFTER UPDATE ON skill_manuals BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'skill_manuals';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_skill_gen_delete AFTER DELETE ON skill_manuals BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'skill_manuals';
+           END''',
+    )),
+    (5, "rca rule table", (
+        # perform_rca classifies against these, lowest priority number first
+        '''CREATE TABLE IF NOT EXISTS rca_rules (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               priority INTEGER NOT NULL DEFAULT 100,
+               pattern TEXT NOT NULL,
+               root_cause TEXT NOT NULL,
+               correction_action TEXT,
+               enabled INTEGER NOT NULL DEFAULT 1,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )''',
+        "CREATE INDEX IF NOT EXISTS idx_rca_rules_priority ON rca_rules(priority, id)",
+        # The rules perform_rca used to hard-code, in their original order
+        '''INSERT INTO rca_rules (priority, pattern, root_cause, correction_action) VALUES
+               (10, 'timeout|connection', 'Network/Connectivity Issue', 'Add retry logic with exponential backoff'),
+               (20, 'permission|access denied', 'Permission/Access Issue', 'Verify credentials and access rights'),
+               (30, 'syntax|parse', 'Syntax/Parse Error', 'Review code syntax and input format'),
+               (40, 'memory|resource', 'Resource Exhaustion', 'Optimize memory usage, add limits')''',
+        "INSERT OR IGNORE INTO cache_generations (name, generation) VALUES ('rca_rules', 0)",
+        '''CREATE TRIGGER IF NOT EXISTS trg_rca_gen_insert AFTER INSERT ON rca_rules BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'rca_rules';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_rca_gen_update AFTER UPDATE ON rca_rules BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'rca_rules';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_rca_gen_delete AFTER DELETE ON rca_rules BEGIN
+               UPDATE cache_generations SET generation = generation + 1 WHERE name = 'rca_rules';
+           END''',
+    )),
+    (6, "execution pattern sketches", _unique_execution_patterns),
+    (7, "execution pattern time buckets", (
+        # minute/hour/day aggregates; bucket_start is unix seconds (UTC)
+        '''CREATE TABLE IF NOT EXISTS execution_pattern_buckets (
+               pattern_type TEXT NOT NULL,
+               bucket_start INTEGER NOT NULL,
+               resolution TEXT NOT NULL,
+               execution_count INTEGER NOT NULL DEFAULT 0,
+               success_count INTEGER NOT NULL DEFAULT 0,
+               total_minutes REAL NOT NULL DEFAULT 0,
+               duration_sketch TEXT NOT NULL DEFAULT '{}',
+               PRIMARY KEY (pattern_type, bucket_start, resolution)
+           ) WITHOUT ROWID''',
+        # rollup scans one resolution's aged-out buckets
+        "CREATE INDEX IF NOT EXISTS idx_pattern_buckets_rollup ON execution_pattern_buckets(resolution, bucket_start)",
+    )),
+    (8, "ledger retention", (
+        # Resolved entries are archived a grace period after resolution
+        "ALTER TABLE disciplinary_ledger ADD COLUMN resolved_at TIMESTAMP",
+        "UPDATE disciplinary_ledger SET resolved_at = created_at WHERE resolved = 1",
+        "CREATE INDEX IF NOT EXISTS idx_ledger_resolved_at ON disciplinary_ledger(resolved_at)",
+        # Archived entries stay countable per day and root cause
+        '''CREATE TABLE IF NOT EXISTS ledger_daily_summary (
+               day TEXT NOT NULL,
+               root_cause TEXT NOT NULL,
+               entries INTEGER NOT NULL DEFAULT 0,
+               resolved INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (day, root_cause)
+           ) WITHOUT ROWID''',
+    )),
+    (9, "stats counters", (
+        # O(1) dashboard aggregates, kept current by triggers on every write path
+        '''CREATE TABLE IF NOT EXISTS stats_counters (
+               name TEXT NOT NULL,
+               key TEXT NOT NULL,
+               value INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (name, key)
+           ) WITHOUT ROWID''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_stats_task_insert AFTER INSERT ON tasks BEGIN
+               INSERT INTO stats_counters (name, key, value) VALUES ('tasks_by_status', COALESCE(NEW.status, 'unknown'), 1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value + 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_stats_task_status AFTER UPDATE OF status ON tasks
+           WHEN OLD.status IS NOT NEW.status
+           BEGIN
+               INSERT INTO stats_counters (name, key, value) VALUES ('tasks_by_status', COALESCE(OLD.status, 'unknown'), -1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value - 1;
+               INSERT INTO stats_counters (name, key, value) VALUES ('tasks_by_status', COALESCE(NEW.status, 'unknown'), 1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value + 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_stats_task_delete AFTER DELETE ON tasks BEGIN
+               INSERT INTO stats_counters (name, key, value) VALUES ('tasks_by_status', COALESCE(OLD.status, 'unknown'), -1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value - 1;
+           END''',
+        # Ledger counters are all-time: archiving deletes rows but not history
+        '''CREATE TRIGGER IF NOT EXISTS trg_stats_ledger_insert AFTER INSERT ON disciplinary_ledger BEGIN
+               INSERT INTO stats_counters (name, key, value) VALUES ('ledger_by_root_cause', COALESCE(NEW.root_cause, 'unknown'), 1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value + 1;
+               INSERT INTO stats_counters (name, key, value) VALUES ('ledger', CASE WHEN NEW.resolved THEN 'resolved' ELSE 'open' END, 1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value + 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_stats_ledger_resolved AFTER UPDATE OF resolved ON disciplinary_ledger
+           WHEN OLD.resolved IS NOT NEW.resolved
+           BEGIN
+               INSERT INTO stats_counters (name, key, value) VALUES ('ledger', CASE WHEN OLD.resolved THEN 'resolved' ELSE 'open' END, -1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value - 1;
+               INSERT INTO stats_counters (name, key, value) VALUES ('ledger', CASE WHEN NEW.resolved THEN 'resolved' ELSE 'open' END, 1)
+                   ON CONFLICT(name, key) DO UPDATE SET value = value + 1;
+           END''',
+        # Backfill from what is there now, archived entries included
+        '''INSERT OR REPLACE INTO stats_counters (name, key, value)
+           SELECT 'tasks_by_status', COALESCE(status, 'unknown'), COUNT(*) FROM tasks GROUP BY 2''',
+        '''INSERT OR REPLACE INTO stats_counters (name, key, value)
+           SELECT 'ledger_by_root_cause', root_cause, SUM(entries) FROM (
+               SELECT COALESCE(root_cause, 'unknown') AS root_cause, 1 AS entries FROM disciplinary_ledger
+               UNION ALL
+               SELECT root_cause, entries FROM ledger_daily_summary
+           ) GROUP BY root_cause''',
+        '''INSERT OR REPLACE INTO stats_counters (name, key, value)
+           SELECT 'ledger', state, SUM(entries) FROM (
+               SELECT CASE WHEN resolved THEN 'resolved' ELSE 'open' END AS state, 1 AS entries
+               FROM disciplinary_ledger
+               UNION ALL
+               SELECT 'resolved', resolved FROM ledger_daily_summary
+               UNION ALL
+               SELECT 'open', entries - resolved FROM ledger_daily_summary
+           ) GROUP BY state''',
+    )),
+    (10, "worker leases", (
+        # Who is running a task and until when; a lapsed lease makes it claimable again
+        "ALTER TABLE execution_state ADD COLUMN lease_owner TEXT",
+        "ALTER TABLE execution_state ADD COLUMN lease_expires_at REAL",
+        "CREATE INDEX IF NOT EXISTS idx_state_lease_expiry ON execution_state(lease_expires_at)",
+    )),
+    (11, "heartbeat index", (
+        # The stale-heartbeat reaper is a range scan on this
+        "CREATE INDEX IF NOT EXISTS idx_state_heartbeat ON execution_state(last_heartbeat)",
+    )),
+    (12, "queue score", (
+        # Time-invariant scheduler score; TaskScheduler fills it in for existing rows
+        "ALTER TABLE tasks ADD COLUMN queue_score REAL",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks(status, queue_score, id)",
+    )),
+    (13, "utc heartbeats", _utc_heartbeats),
+    (14, "pending queue index and estimate snapshot", (
+        # Only pending rows: finishing or claiming a task no longer rewrites an entry
+        "DROP INDEX IF EXISTS idx_tasks_queue",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks(status, queue_score, id) WHERE status = 'pending'",
+        # Estimate a category's queue_scores were computed with; NULL is the scheduler default
+        "ALTER TABLE execution_patterns ADD COLUMN scored_minutes REAL",
+    )),
+    (15, "ledger by task and running categories", (
+        # A task's ledger rows come back newest first without a sort
+        "DROP INDEX IF EXISTS idx_ledger_task",
+        "CREATE INDEX IF NOT EXISTS idx_ledger_task_created ON disciplinary_ledger(task_id, created_at)",
+        # Running tasks grouped by category for the scheduler's caps, on every claim.
+        # The expression is services.scheduler.CATEGORY_SQL; the planner only uses
+        # the index while the two agree, which tests/test_query_plans.py checks.
+        '''CREATE INDEX IF NOT EXISTS idx_tasks_running_category ON tasks(status, (
+               CASE
+                   WHEN intent_keywords IS NULL OR intent_keywords = '' THEN 'general'
+                   WHEN instr(intent_keywords, ',') > 0 THEN substr(intent_keywords, 1, instr(intent_keywords, ',') - 1)
+                   ELSE intent_keywords
+               END
+           )) WHERE status = 'running'
+        ''',
+    )),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration, 0 for a fresh database."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in order. Returns the resulting schema version."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    for version, description, step in MIGRATIONS:
+        if version <= current_version(conn):
+            continue
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            if callable(step):
+                step(c)
+            else:
+                for sql in step:
+                    c.execute(sql)
+            c.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        print(f"🔧 SWP schema migrated to v{version}: {description}")
+
+    return current_version(conn)
+
@@ -0,0 +1,68 @@
+"""
+SWP Duration Sketch
+Sovereign Workflow Protocol - Mergeable Log-Bucket Quantile Sketch
+
+Durations are counted in logarithmic buckets (as in DDSketch): bucket k holds
+values in (GAMMA^(k-1), GAMMA^k], so any quantile read back is within
+RELATIVE_ACCURACY of a true sample. A sketch is a JSON object of
+{bucket key: count}; SQLite updates it in place with json_set, and two
+sketches merge by adding counts.
+"""
+
+import math
+from typing import Dict, Iterable, Mapping, Optional
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_VALUE = 1e-3            # minutes; anything at or below is counted as zero
+ZERO_KEY = "zero"
+
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_key(value: float) -> str:
+    if value <= MIN_VALUE:
+        return ZERO_KEY
+    return str(math.ceil(math.log(value) / _LOG_GAMMA))
+
+
+def bucket_value(key: str) -> float:
+    """Representative value of a bucket, within RELATIVE_ACCURACY of anything in it."""
+    if key == ZERO_KEY:
+        return 0.0
+    return 2 * GAMMA ** int(key) / (GAMMA + 1)
+
+
+def merge(sketches: Iterable[Mapping[str, int]]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for sketch in sketches:
+        for key, count in sketch.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def quantile(sketch: Mapping[str, int], q: float) -> Optional[float]:
+    """Value at quantile q (0..1), or None for an empty sketch."""
+    buckets = sorted(
+        ((bucket_value(k), c) for k, c in sketch.items() if c > 0),
+        key=lambda b: b[0]
+    )
+    total = sum(c for _, c in buckets)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for value, count in buckets:
+        seen += count
+        if seen > rank:
+            return value
+    return buckets[-1][0]
+
+
+def percentiles(sketch: Mapping[str, int], qs=(50, 90, 99)) -> Dict[str, Optional[float]]:
+    """{"p50": ..., "p90": ..., "p99": ...} for the given percentiles."""
+    result = {}
+    for q in qs:
+        value = quantile(sketch, q / 100)
+        result[f"p{q}"] = round(value, 3) if value is not None else None
+    return result
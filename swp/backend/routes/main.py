@@ -7,14 +7,37 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
+from contextlib import asynccontextmanager
+import asyncio
+import codecs
 import json
 
-from services.engine import SWPEngine
+from services.engine import TASK_PAGE_LIMIT, TASK_PAGE_MAX, SKILL_SEARCH_LIMIT
+from services.async_engine import AsyncSWPEngine
+from services.events import EVENT_BUS
+from services.reaper import HeartbeatReaper
+from services.ledger import LEDGER_RETENTION_DAYS
+from services.scheduler import QUEUE_VIEW_LIMIT
 
-app = FastAPI(title="Sovereign Workflow Protocol")
+EVENT_HEARTBEAT_SECONDS = 15
+RCA_BATCH_MAX = 1000
+TASK_BATCH_MAX = 1000
+
+engine = AsyncSWPEngine()
+
+reaper = HeartbeatReaper(engine.engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reaper.start()
+    yield
+    reaper.stop()
+    engine.shutdown()
+
+app = FastAPI(title="Sovereign Workflow Protocol", lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
 
 app.add_middleware(
@@ -25,13 +48,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-engine = SWPEngine()
-
 # === MODELS ===
 class TaskCreate(BaseModel):
     title: str
     description: str
 
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate]
+
 class TaskUpdate(BaseModel):
     status: Optional[str] = None
     checklist: Optional[List[str]] = None
@@ -46,100 +70,269 @@ class VerificationRequest(BaseModel):
     task_id: int
     output: str
 
+class ProtocolVerificationRequest(BaseModel):
+    task_id: int
+    targets: Dict[str, List[str]]
+
 class RCARequest(BaseModel):
     task_id: int
     error_message: str
 
+class RCABatchRequest(BaseModel):
+    errors: List[RCARequest]
+
+class RCARuleCreate(BaseModel):
+    pattern: str
+    root_cause: str
+    correction_action: str = ""
+    priority: int = 100
+
 # === TASK ROUTES ===
 @app.post("/api/tasks")
-def create_task(task: TaskCreate):
-    task_id = engine.create_task(task.title, task.description)
+async def create_task(task: TaskCreate):
+    task_id = await engine.create_task(task.title, task.description)
     return {"task_id": task_id, "status": "pending"}
 
+@app.post("/api/tasks/batch")
+async def create_tasks(batch: TaskBatchCreate):
+    """Create many tasks (e.g. planner subtasks) in a single transaction."""
+    if len(batch.tasks) > TASK_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {TASK_BATCH_MAX} tasks per batch")
+    task_ids = await engine.create_tasks([t.model_dump() for t in batch.tasks])
+    return {"task_ids": task_ids, "status": "pending"}
+
 @app.get("/api/tasks")
-def list_tasks(status: Optional[str] = None):
-    return engine.list_tasks(status)
+async def list_tasks(status: Optional[str] = None, fields: Optional[str] = None,
+                     limit: int = TASK_PAGE_LIMIT, cursor: Optional[str] = None,
+                     with_total: bool = False):
+    """Keyset-paginated task list. Pass `next_cursor` back as `cursor` for the next page."""
+    try:
+        return await engine.list_tasks_page(
+            status,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def task_etag(task_id: int, version: int, state_seq: int = 0) -> str:
+    """Stored version plus this process's count of buffered execution-state saves."""
+    return f'W/"task-{task_id}-v{version}-s{state_seq}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
 @app.get("/api/tasks/{task_id}")
-def get_task(task_id: int):
-    task = engine.get_task(task_id)
+async def get_task(task_id: int, request: Request):
+    """Task with memory tiers and execution state. Supports If-None-Match."""
+    if_none_match = request.headers.get("if-none-match")
+    # Read before the view so the tag never claims newer state than the body holds
+    state_seq = engine.get_state_seq(task_id)
+    if if_none_match:
+        version = await engine.get_task_version(task_id)
+        etag = task_etag(task_id, version, state_seq)
+        if version is not None and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+    
+    task = await engine.get_task_view(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    # Load memory tiers
-    task["memory"] = engine.get_task_memory(task_id)
-    # Load execution state
-    task["execution_state"] = engine.load_execution_state(task_id)
-    return task
+    return JSONResponse(task, headers={"ETag": task_etag(task_id, task["version"], state_seq)})
 
 @app.patch("/api/tasks/{task_id}")
-def update_task(task_id: int, update: TaskUpdate):
+async def update_task(task_id: int, update: TaskUpdate):
     # This would update task - simplified for demo
     return {"task_id": task_id, "updated": True}
 
 # === VERIFICATION HOOK ===
 @app.post("/api/verify")
-def verify_output(req: VerificationRequest):
+async def verify_output(req: VerificationRequest):
     """Post-task verification hook."""
-    result = engine.verify_task(req.task_id, req.output)
+    result = await engine.verify_task(req.task_id, req.output)
     return result
 
+@app.post("/api/verify/{task_id}/stream")
+async def verify_output_stream(task_id: int, request: Request):
+    """
+    Verification over a chunked request body (raw UTF-8 output). Chunks are
+    checked as they arrive and reading stops once the verdict is settled.
+    """
+    verifier = await engine.start_verification(task_id)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in request.stream():
+        if verifier.feed(decoder.decode(chunk)):
+            break
+    else:
+        verifier.feed(decoder.decode(b"", final=True))
+    result = await engine.finish_verification(verifier)
+    result["stopped_early"] = verifier.stopped_early
+    result["chars_scanned"] = verifier.chars_seen
+    return result
+
+@app.post("/api/verify/protocols")
+async def verify_protocols(req: ProtocolVerificationRequest):
+    """
+    Run declared verification protocols (api key, files, service health) in
+    parallel. Only each protocol's source_of_truth and configured
+    allowed_targets can be checked from here.
+    """
+    try:
+        return await engine.verify_protocols(req.task_id, req.targets, restricted=True)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # === RCA HOOK ===
 @app.post("/api/rca")
-def trigger_rca(req: RCARequest):
+async def trigger_rca(req: RCARequest):
     """Self-audit and disciplinary logic."""
-    result = engine.perform_rca(req.task_id, req.error_message)
+    result = await engine.perform_rca(req.task_id, req.error_message)
     return result
 
+@app.post("/api/rca/batch")
+async def trigger_rca_batch(req: RCABatchRequest):
+    """Classify and log many errors in one transaction (e.g. after an outage)."""
+    if len(req.errors) > RCA_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {RCA_BATCH_MAX} errors per batch")
+    results = await engine.perform_rca_batch([e.model_dump() for e in req.errors])
+    return {"results": results, "count": len(results)}
+
+@app.get("/api/rca/rules")
+async def get_rca_rules():
+    return await engine.get_rca_rules()
+
+@app.post("/api/rca/rules")
+async def add_rca_rule(rule: RCARuleCreate):
+    try:
+        rule_id = await engine.add_rca_rule(
+            rule.pattern, rule.root_cause, rule.correction_action, rule.priority
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"id": rule_id, "created": True}
+
 # === SKILL MANUALS ===
 @app.post("/api/skills")
-def add_skill_manual(manual: SkillManualCreate):
-    manual_id = engine.add_skill_manual(
+async def add_skill_manual(manual: SkillManualCreate):
+    manual_id = await engine.add_skill_manual(
         manual.name, manual.category, manual.content, manual.keywords or ""
     )
     return {"manual_id": manual_id}
 
 @app.get("/api/skills")
-def list_skills(category: Optional[str] = None):
-    return engine.get_skill_manuals(category)
+async def list_skills(category: Optional[str] = None):
+    return await engine.get_skill_manuals(category)
+
+@app.get("/api/skills/search")
+async def search_skills(q: str, k: int = SKILL_SEARCH_LIMIT, category: Optional[str] = None):
+    """Full-text search over skill manuals, BM25-ranked with snippets."""
+    return await engine.search_skill_manuals(q, max(1, min(k, 50)), category)
+
+@app.get("/api/skills/cache")
+async def skill_cache_stats():
+    """Skill manual cache size and hit rate."""
+    return engine.get_skill_cache_stats()
 
 @app.get("/api/skills/{category}/load")
-def load_skill_for_task(category: str):
+async def load_skill_for_task(category: str):
     """Pre-task hook: Load skill manual."""
-    manuals = engine.get_skill_manuals(category)
+    manuals = await engine.get_skill_manuals(category)
     return {"manual": manuals[0] if manuals else None} if manuals else {"manual": None}
 
 # === MEMORY ===
 @app.get("/api/memory/{task_id}")
-def get_task_memory(task_id: int):
+async def get_task_memory(task_id: int):
     """Get three-tier memory for task."""
-    return engine.get_task_memory(task_id)
+    return await engine.get_task_memory(task_id)
 
 # === DISCIPLINARY LEDGER ===
 @app.get("/api/disciplinary")
-def get_disciplinary_records(task_id: Optional[int] = None):
-    return engine.get_disciplinary_records(task_id)
+async def get_disciplinary_records(task_id: Optional[int] = None, days: Optional[int] = None,
+                                   archive: bool = False):
+    """Recent entries by default; `days` widens the window, `archive=true` adds archived entries."""
+    return await engine.get_disciplinary_records(task_id, days, archive)
+
+@app.get("/api/disciplinary/summary")
+async def get_ledger_summary(days: int = LEDGER_RETENTION_DAYS):
+    return await engine.get_ledger_summary(days)
+
+@app.post("/api/disciplinary/archive")
+async def archive_disciplinary_records():
+    return await engine.archive_disciplinary_records()
+
+@app.post("/api/disciplinary/{record_id}/resolve")
+async def resolve_disciplinary_record(record_id: int):
+    if not await engine.resolve_disciplinary_record(record_id):
+        raise HTTPException(status_code=404, detail="Record not found")
+    return {"id": record_id, "resolved": True}
+
+# === QUEUE ===
+@app.get("/api/queue")
+async def get_queue(limit: int = QUEUE_VIEW_LIMIT):
+    """Pending tasks in claim order, with expected durations and category caps."""
+    return await engine.get_queue(max(1, min(limit, TASK_PAGE_MAX)))
+
+# === STATS ===
+@app.get("/api/stats")
+async def get_stats():
+    """Task status counts and ledger breakdowns from incrementally maintained counters."""
+    return await engine.get_stats()
 
 # === PATTERN RECOGNITION ===
 @app.get("/api/patterns/{pattern_type}/hints")
-def get_hints(pattern_type: str):
-    return engine.get_optimization_hints(pattern_type)
+async def get_hints(pattern_type: str, window: Optional[str] = None):
+    """All-time hints, or only the last `window` (e.g. 1h, 24h, 7d) of executions."""
+    try:
+        return await engine.get_optimization_hints(pattern_type, window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # === STATE PERSISTENCE ===
 @app.post("/api/state/{task_id}/save")
-def save_state(task_id: int, current_step: str, step_index: int):
-    engine.save_execution_state(task_id, current_step, step_index)
+async def save_state(task_id: int, current_step: str, step_index: int):
+    await engine.save_execution_state(task_id, current_step, step_index)
     return {"saved": True}
 
 @app.get("/api/state/{task_id}/resume")
-def resume_state(task_id: int):
-    state = engine.load_execution_state(task_id)
+async def resume_state(task_id: int):
+    state = await engine.load_execution_state(task_id)
     if not state:
         raise HTTPException(status_code=404, detail="No saved state found")
     return state
 
+# === EVENT STREAM ===
+def format_sse(event: dict) -> str:
+    event_id = f"id: {event['id']}\n" if event.get("id") else ""
+    return f"{event_id}event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+@app.get("/api/events")
+async def event_stream(request: Request):
+    """Server-sent events: task_created, task_status, task_state, rca_logged, skill_added, heartbeat."""
+    queue = EVENT_BUS.subscribe()
+    
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    event = {"type": "heartbeat", "data": {}}
+                yield format_sse(event)
+        finally:
+            EVENT_BUS.unsubscribe(queue)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # === WEB DASHBOARD ===
 @app.get("/", response_class=HTMLResponse)
-def dashboard():
+async def dashboard():
     return """
     <!DOCTYPE html>
     <html>
@@ -213,9 +406,11 @@ def dashboard():
                     
                     <div class="card">
                         <h2>📋 Active Tasks</h2>
+                        <p style="color:#666;margin-bottom:10px" id="taskStats"></p>
                         <div class="task-list" id="taskList">
                             <p style="color:#666">No active tasks</p>
                         </div>
+                        <button class="btn btn-small hidden" id="moreTasks" onclick="loadTasks(true)">Load more</button>
                     </div>
                 </div>
             </div>
@@ -251,6 +446,7 @@ def dashboard():
                 <div class="card">
                     <h2>📊 Disciplinary Ledger</h2>
                     <p style="color:#666;margin-bottom:15px">Root Cause Analysis & Error Tracking</p>
+                    <p style="color:#666;margin-bottom:15px" id="ledgerStats"></p>
                     <div id="ledgerList"></div>
                 </div>
             </div>
@@ -292,34 +488,45 @@ def dashboard():
                 alert('Task #' + data.task_id + ' created');
                 document.getElementById('taskTitle').value = '';
                 document.getElementById('taskDesc').value = '';
-                loadTasks();
+                // The task_created event adds it to the list
+            }
+            
+            const TASK_FIELDS = 'id,title,status,description,checklist';
+            let taskCursor = null;
+            
+            function renderTask(t) {
+                const checklist = t.checklist ? JSON.parse(t.checklist) : [];
+                return `
+                    <div class="task-item ${t.status}" id="task-${t.id}">
+                        <div class="task-header">
+                            <span class="task-title">#${t.id} ${t.title}</span>
+                            <span class="task-status">${t.status}</span>
+                        </div>
+                        <p style="font-size:0.85rem;color:#888;margin:5px 0">${(t.description || '').substring(0,100)}...</p>
+                        <div class="checklist">
+                            ${checklist.slice(0,3).map((c,i) => `<div class="checklist-item">☐ ${c}</div>`).join('')}
+                        </div>
+                    </div>
+                `;
             }
             
-            async function loadTasks() {
-                const res = await fetch(API + '/api/tasks');
-                const tasks = await res.json();
+            async function loadTasks(more = false) {
+                let url = API + '/api/tasks?fields=' + TASK_FIELDS;
+                if (more && taskCursor) url += '&cursor=' + encodeURIComponent(taskCursor);
+                const res = await fetch(url);
+                const page = await res.json();
+                const tasks = page.items;
                 const list = document.getElementById('taskList');
+                taskCursor = page.next_cursor;
+                document.getElementById('moreTasks').classList.toggle('hidden', !taskCursor);
                 
-                if (!tasks.length) {
-                    list.innerHTML = '<p style=\"color:#666\">No tasks</p>';
+                if (!more && !tasks.length) {
+                    list.innerHTML = '<p style="color:#666">No tasks</p>';
                     return;
                 }
                 
-                list.innerHTML = tasks.map(t => {
-                    const checklist = t.checklist ? JSON.parse(t.checklist) : [];
-                    return `
-                        <div class=\"task-item ${t.status}\">
-                            <div class=\"task-header\">
-                                <span class=\"task-title\">#${t.id} ${t.title}</span>
-                                <span class=\"task-status\">${t.status}</span>
-                            </div>
-                            <p style=\"font-size:0.85rem;color:#888;margin:5px 0\">${t.description.substring(0,100)}...</p>
-                            <div class=\"checklist\">
-                                ${checklist.slice(0,3).map((c,i) => `<div class=\"checklist-item\">☐ ${c}</div>`).join('')}
-                            </div>
-                        </div>
-                    `;
-                }).join('');
+                const html = tasks.map(renderTask).join('');
+                list.innerHTML = more ? list.innerHTML + html : html;
             }
             
             async function addSkill() {
@@ -334,21 +541,33 @@ def dashboard():
                     body: JSON.stringify({name, category, keywords, content})
                 });
                 alert('Manual saved');
-                loadSkills();
+                // The skill_added event adds it to the vault
+            }
+            
+            function renderSkill(s) {
+                return `
+                    <div style="background:#0a0a0f;padding:12px;margin-bottom:8px;border-radius:8px">
+                        <span class="skill-category">${s.category}</span>
+                        <strong>${s.name}</strong>
+                        <p style="font-size:0.85rem;color:#888;margin-top:5px">${s.content.substring(0,100)}...</p>
+                    </div>
+                `;
             }
             
             async function loadSkills() {
                 const res = await fetch(API + '/api/skills');
                 const skills = await res.json();
-                const list = document.getElementById('skillList');
-                
-                list.innerHTML = skills.map(s => `
-                    <div style=\"background:#0a0a0f;padding:12px;margin-bottom:8px;border-radius:8px\">
-                        <span class=\"skill-category\">${s.category}</span>
-                        <strong>${s.name}</strong>
-                        <p style=\"font-size:0.85rem;color:#888;margin-top:5px\">${s.content.substring(0,100)}...</p>
+                document.getElementById('skillList').innerHTML = skills.map(renderSkill).join('');
+            }
+            
+            function renderLedger(r) {
+                return `
+                    <div class="ledger-item">
+                        <div class="error">⚠️ ${r.error_type}</div>
+                        <div class="root-cause">🔍 Root Cause: ${r.root_cause}</div>
+                        <div class="correction">✅ Correction: ${r.correction_action}</div>
                     </div>
-                `).join('');
+                `;
             }
             
             async function loadLedger() {
@@ -357,27 +576,65 @@ def dashboard():
                 const list = document.getElementById('ledgerList');
                 
                 if (!records.length) {
-                    list.innerHTML = '<p style=\"color:#666\">No disciplinary records</p>';
+                    list.innerHTML = '<p style="color:#666">No disciplinary records</p>';
                     return;
                 }
                 
-                list.innerHTML = records.map(r => `
-                    <div class=\"ledger-item\">
-                        <div class=\"error\">⚠️ ${r.error_type}</div>
-                        <div class=\"root-cause\">🔍 Root Cause: ${r.root_cause}</div>
-                        <div class=\"correction\">✅ Correction: ${r.correction_action}</div>
-                    </div>
-                `).join('');
+                list.innerHTML = records.map(renderLedger).join('');
+            }
+            
+            async function loadStats() {
+                const res = await fetch(API + '/api/stats');
+                const stats = await res.json();
+                document.getElementById('taskStats').textContent =
+                    Object.entries(stats.tasks_by_status).map(([status, n]) => status + ': ' + n).join(' · ');
+                document.getElementById('ledgerStats').textContent =
+                    'Open: ' + stats.ledger.open + ' · Resolved: ' + stats.ledger.resolved;
+            }
+            
+            // Counters are cheap to read; coalesce bursts of events into one refresh
+            let statsTimer = null;
+            function refreshStats() {
+                clearTimeout(statsTimer);
+                statsTimer = setTimeout(loadStats, 500);
+            }
+            
+            // === LIVE UPDATES (server-sent events) ===
+            function prependTo(listId, html) {
+                const list = document.getElementById(listId);
+                if (!list.querySelector('div')) list.innerHTML = '';
+                list.insertAdjacentHTML('afterbegin', html);
+            }
+            
+            const handlers = {
+                task_created: t => prependTo('taskList', renderTask(t)),
+                task_status: t => {
+                    const el = document.getElementById('task-' + t.id);
+                    if (!el) return;
+                    el.className = 'task-item ' + t.status;
+                    el.querySelector('.task-status').textContent = t.status;
+                },
+                rca_logged: r => prependTo('ledgerList', renderLedger(r)),
+                skill_added: s => prependTo('skillList', renderSkill(s)),
+                resync: () => { loadTasks(); loadSkills(); loadLedger(); loadStats(); },
+            };
+            
+            function connectEvents() {
+                const source = new EventSource(API + '/api/events');
+                Object.entries(handlers).forEach(([type, apply]) =>
+                    source.addEventListener(type, e => { apply(JSON.parse(e.data)); refreshStats(); }));
+                // EventSource reconnects by itself; catch up on anything missed meanwhile
+                source.addEventListener('open', () => handlers.resync());
             }
             
             // Initial load
-            loadTasks();
+            connectEvents();
         </script>
     </body>
     </html>
     """
 
 @app.get("/dashboard")
-def dashboard_redirect():
+async def dashboard_redirect():
     from fastapi.responses import RedirectResponse
     return RedirectResponse("/")
@@ -1,4 +1,4 @@
 # SWP Services
-from .engine import SWPEngine
+from .engine import SWPEngine, get_engine
 
-__all__ = ["SWPEngine"]
+__all__ = ["SWPEngine", "get_engine"]
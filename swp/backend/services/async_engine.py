@@ -0,0 +1,209 @@
+"""
+SWP Async Engine
+Sovereign Workflow Protocol - asyncio Facade for the FastAPI Routes
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable, Sequence
+
+from services.engine import SWPEngine, get_engine, TASK_PAGE_LIMIT, SKILL_SEARCH_LIMIT, RELATED_SKILL_LIMIT, LEASE_SECONDS
+from services.verification import OutputVerifier
+from services.ledger import LEDGER_RETENTION_DAYS
+from services.scheduler import QUEUE_VIEW_LIMIT
+from services.metrics import timed_executor_call
+
+READ_WORKERS = 4    # concurrent SQLite readers (WAL lets them run alongside the writer)
+
+
+class AsyncSWPEngine:
+    """
+    Same surface as SWPEngine, awaitable. SQLite work runs on dedicated DB
+    executors instead of Starlette's shared threadpool:
+    - one writer thread, since SQLite admits a single writer anyway and
+      queueing in-process beats spinning on busy_timeout;
+    - a small reader pool for snapshot reads.
+    Every executor thread keeps its own pooled connection.
+    """
+
+    def __init__(self, engine: Optional[SWPEngine] = None, read_workers: int = READ_WORKERS):
+        self.engine = engine or get_engine()
+        self._reader = ThreadPoolExecutor(read_workers, thread_name_prefix="swp-db-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="swp-db-write")
+
+    async def _read(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        job = timed_executor_call("read", functools.partial(fn, *args, **kwargs))
+        return await loop.run_in_executor(self._reader, job)
+
+    async def _write(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        job = timed_executor_call("write", functools.partial(fn, *args, **kwargs))
+        return await loop.run_in_executor(self._writer, job)
+
+    def shutdown(self):
+        """Drain the DB executors, writing out buffered execution state first."""
+        self._writer.submit(self.engine.flush_execution_state).result()
+        self._writer.shutdown(wait=True)
+        self._reader.shutdown(wait=True)
+
+    # === PRE-TASK / INTENT ===
+    async def load_skill_manual(self, task_description: str) -> Optional[Dict]:
+        return await self._read(self.engine.load_skill_manual, task_description)
+
+    def parse_intent(self, captain_intent: str) -> Dict[str, Any]:
+        """CPU only; no executor hop."""
+        return self.engine.parse_intent(captain_intent)
+
+    def parse_intents(self, intents: List[str]) -> List[Dict[str, Any]]:
+        return self.engine.parse_intents(intents)
+
+    # === VERIFICATION & RCA ===
+    async def verify_task(self, task_id: int, output: str) -> Dict[str, Any]:
+        return await self._write(self.engine.verify_task, task_id, output)
+
+    async def verify_task_stream(self, task_id: int, chunks: Iterable[str]) -> Dict[str, Any]:
+        """For synchronous iterables; async bodies feed start_verification() directly."""
+        return await self._write(self.engine.verify_task_stream, task_id, chunks)
+
+    async def start_verification(self, task_id: int) -> OutputVerifier:
+        return await self._read(self.engine.start_verification, task_id)
+
+    async def finish_verification(self, verifier: OutputVerifier) -> Dict[str, Any]:
+        return await self._write(self.engine.finish_verification, verifier)
+
+    async def verify_protocols(self, task_id: int, targets: Dict[str, List[str]],
+                               restricted: bool = False) -> Dict[str, Any]:
+        """Network and file checks, not SQLite; kept off the DB executors."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.engine.verify_protocols, task_id, targets, restricted))
+
+    async def perform_rca(self, task_id: int, error_message: str) -> Dict[str, Any]:
+        return await self._write(self.engine.perform_rca, task_id, error_message)
+
+    async def perform_rca_batch(self, errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._write(self.engine.perform_rca_batch, errors)
+
+    async def get_rca_rules(self) -> List[Dict]:
+        return await self._read(self.engine.get_rca_rules)
+
+    async def add_rca_rule(self, pattern: str, root_cause: str, correction_action: str = "",
+                           priority: int = 100) -> int:
+        return await self._write(self.engine.add_rca_rule, pattern, root_cause, correction_action, priority)
+
+    # === THREE-TIER MEMORY ===
+    async def save_memory_tier1(self, task_id: int, title: str, plan_content: str, phase: str):
+        return await self._write(self.engine.save_memory_tier1, task_id, title, plan_content, phase)
+
+    async def save_memory_tier2(self, task_id: int, context_key: str, context_value: str):
+        return await self._write(self.engine.save_memory_tier2, task_id, context_key, context_value)
+
+    async def save_memory_tier3(self, task_id: int, checklist: List[str]):
+        return await self._write(self.engine.save_memory_tier3, task_id, checklist)
+
+    async def get_task_memory(self, task_id: int) -> Dict[str, Any]:
+        return await self._read(self.engine.get_task_memory, task_id)
+
+    # === STATE PERSISTENCE ===
+    async def save_execution_state(self, task_id: int, current_step: str, step_index: int):
+        return await self._write(self.engine.save_execution_state, task_id, current_step, step_index)
+
+    async def load_execution_state(self, task_id: int) -> Optional[Dict]:
+        return await self._read(self.engine.load_execution_state, task_id)
+
+    async def flush_execution_state(self) -> int:
+        return await self._write(self.engine.flush_execution_state)
+
+    def get_state_seq(self, task_id: int) -> int:
+        """In-memory only; no executor hop."""
+        return self.engine.get_state_seq(task_id)
+
+    # === WORKER LEASES ===
+    async def claim_tasks(self, owner: str, limit: int = 1, lease_seconds: float = LEASE_SECONDS) -> List[Dict]:
+        return await self._write(self.engine.claim_tasks, owner, limit, lease_seconds)
+
+    async def reap_stale_tasks(self) -> List[int]:
+        return await self._write(self.engine.reap_stale_tasks)
+
+    async def get_queue(self, limit: int = QUEUE_VIEW_LIMIT) -> Dict[str, Any]:
+        return await self._read(self.engine.get_queue, limit)
+
+    async def renew_leases(self, owner: str, task_ids: Sequence[int],
+                           lease_seconds: float = LEASE_SECONDS) -> List[int]:
+        return await self._write(self.engine.renew_leases, owner, task_ids, lease_seconds)
+
+    async def release_lease(self, task_id: int, owner: str) -> bool:
+        return await self._write(self.engine.release_lease, task_id, owner)
+
+    async def complete_task(self, task_id: int, owner: str, output: Optional[str] = None,
+                            error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return await self._write(self.engine.complete_task, task_id, owner, output, error)
+
+    # === TASK MANAGEMENT ===
+    async def create_task(self, title: str, description: str) -> int:
+        return await self._write(self.engine.create_task, title, description)
+
+    async def create_tasks(self, tasks: List[Dict[str, str]]) -> List[int]:
+        return await self._write(self.engine.create_tasks, tasks)
+
+    async def get_task(self, task_id: int) -> Optional[Dict]:
+        return await self._read(self.engine.get_task, task_id)
+
+    async def get_task_version(self, task_id: int) -> Optional[int]:
+        return await self._read(self.engine.get_task_version, task_id)
+
+    async def get_task_view(self, task_id: int) -> Optional[Dict]:
+        return await self._read(self.engine.get_task_view, task_id)
+
+    async def list_tasks(self, status: Optional[str] = None) -> List[Dict]:
+        return await self._read(self.engine.list_tasks, status)
+
+    async def list_tasks_page(self, status: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                              limit: int = TASK_PAGE_LIMIT, cursor: Optional[str] = None,
+                              with_total: bool = False) -> Dict[str, Any]:
+        return await self._read(self.engine.list_tasks_page, status, fields, limit, cursor, with_total)
+
+    # === SKILL MANUAL CRUD ===
+    async def add_skill_manual(self, name: str, category: str, content: str, keywords: str = "") -> int:
+        return await self._write(self.engine.add_skill_manual, name, category, content, keywords)
+
+    async def get_skill_manuals(self, category: Optional[str] = None) -> List[Dict]:
+        return await self._read(self.engine.get_skill_manuals, category)
+
+    async def search_skill_manuals(self, query: str, k: int = SKILL_SEARCH_LIMIT,
+                                   category: Optional[str] = None) -> List[Dict]:
+        return await self._read(self.engine.search_skill_manuals, query, k, category)
+
+    async def related_skill_manuals(self, task_description: str, k: int = RELATED_SKILL_LIMIT) -> List[Dict]:
+        return await self._read(self.engine.related_skill_manuals, task_description, k)
+
+    def get_skill_cache_stats(self) -> Dict[str, Any]:
+        """In-memory only; no executor hop."""
+        return self.engine.get_skill_cache_stats()
+
+    # === DISCIPLINARY LEDGER ===
+    async def get_disciplinary_records(self, task_id: Optional[int] = None, days: Optional[int] = None,
+                                       include_archive: bool = False) -> List[Dict]:
+        return await self._read(self.engine.get_disciplinary_records, task_id, days, include_archive)
+
+    async def resolve_disciplinary_record(self, record_id: int) -> bool:
+        return await self._write(self.engine.resolve_disciplinary_record, record_id)
+
+    async def archive_disciplinary_records(self) -> Dict[str, int]:
+        return await self._write(self.engine.archive_disciplinary_records)
+
+    async def get_ledger_summary(self, days: int = LEDGER_RETENTION_DAYS) -> List[Dict]:
+        return await self._read(self.engine.get_ledger_summary, days)
+
+    # === STATS ===
+    async def get_stats(self) -> Dict[str, Any]:
+        return await self._read(self.engine.get_stats)
+
+    # === PATTERN RECOGNITION ===
+    async def record_pattern(self, pattern_type: str, duration_minutes: float, success: bool, errors: List[str]):
+        return await self._write(self.engine.record_pattern, pattern_type, duration_minutes, success, errors)
+
+    async def get_optimization_hints(self, pattern_type: str, window: Optional[str] = None) -> Optional[Dict]:
+        return await self._read(self.engine.get_optimization_hints, pattern_type, window)
@@ -0,0 +1,106 @@
+"""
+SWP Skill Manual Cache
+Sovereign Workflow Protocol - In-Process LRU with Cross-Process Invalidation
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from models.connection import ConnectionManager
+
+SKILL_CACHE_CAPACITY = 256
+SKILL_CACHE_CHECK_SECONDS = 1.0     # how stale a manual written by another process may be
+
+
+def _copy(value: Any) -> Any:
+    """Cached rows are flat dicts; hand out copies so callers can't mutate the cache."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class SkillManualCache:
+    """
+    Bounded LRU of skill manual reads.
+
+    Local writes call invalidate(). Writes from other processes are caught via
+    the `skill_manuals` row of cache_generations, which triggers bump on every
+    change; it is re-read at most once per check interval.
+    """
+
+    def __init__(self, db: ConnectionManager, capacity: int = SKILL_CACHE_CAPACITY,
+                 check_interval: float = SKILL_CACHE_CHECK_SECONDS):
+        self.db = db
+        self.capacity = capacity
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        self._epoch = 0         # bumped on every clear; guards against caching a stale load
+        self.hits = 0
+        self.misses = 0
+
+    def _read_generation(self) -> int:
+        with self.db.read() as c:
+            c.execute("SELECT generation FROM cache_generations WHERE name = 'skill_manuals'")
+            row = c.fetchone()
+        return row["generation"] if row else 0
+
+    def _clear(self):
+        self._entries.clear()
+        self._epoch += 1
+
+    def _validate(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        generation = self._read_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._clear()
+                self._generation = generation
+            self._checked_at = now
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, loading (and caching) it on a miss."""
+        self._validate()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(self._entries[key])
+            self.misses += 1
+            epoch = self._epoch
+
+        value = loader()
+
+        with self._lock:
+            if epoch == self._epoch:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+        return _copy(value)
+
+    def invalidate(self):
+        """Drop everything; the next lookup re-reads the generation counter."""
+        with self._lock:
+            self._clear()
+            self._checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "generation": self._generation,
+            }
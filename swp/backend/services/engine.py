@@ -6,11 +6,27 @@ Sovereign Workflow Protocol - Execution Engine
 import json
 import re
 import os
+import base64
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from models.database import DB_PATH, init_db
-import sqlite3
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Tuple
+from models.database import DB_PATH, ensure_db, sql_timestamp
+from models.connection import ConnectionManager
+from models.sketch import bucket_key, percentiles
+from services.intent import IntentMatcher
+from services.events import EventBus, EVENT_BUS
+from services.cache import SkillManualCache
+from services.skill_index import SkillIndex, tokenize
+from services.verification import OutputVerifier
+from services.protocols import ProtocolRunner
+from services.rca import RCAClassifier
+from services.pattern_series import PatternSeries
+from services.state_buffer import ExecutionStateBuffer, STATE_FLUSH_SECONDS
+from services.scheduler import TaskScheduler, QUEUE_VIEW_LIMIT, CATEGORY_SQL, task_category
+from services.ledger import LedgerArchive, archive_path_for, LEDGER_RECENT_DAYS, LEDGER_RETENTION_DAYS
+from services.metrics import DB_METRICS
 
 # === KEYWORD INTENT PARSER ===
 INTENT_KEYWORDS = {
@@ -23,7 +39,166 @@ INTENT_KEYWORDS = {
     "backend": ["server", "api", "service", "endpoint", "backend", "logic"],
 }
 
+# Compiled once; shared by parse_intent and load_skill_manual
+INTENT_MATCHER = IntentMatcher(INTENT_KEYWORDS)
 
+# Base checklist by task type
+BASE_CHECKLISTS = {
+    "coding": [
+        "Read relevant Skill Manual",
+        "Verify requirements & acceptance criteria",
+        "Set up development environment",
+        "Write core logic",
+        "Add error handling",
+        "Write unit tests",
+        "Verify implementation against requirements"
+    ],
+    "scraping": [
+        "Read relevant Skill Manual",
+        "Identify target URL structure",
+        "Check robots.txt compliance",
+        "Implement rate limiting",
+        "Handle edge cases & errors",
+        "Store data in required format",
+        "Verify data integrity"
+    ],
+    "recon": [
+        "Read relevant Skill Manual",
+        "Define reconnaissance scope",
+        "Gather OSINT sources",
+        "Document findings",
+        "Cross-verify information"
+    ],
+    "deployment": [
+        "Read relevant Skill Manual",
+        "Verify build passes tests",
+        "Check environment variables",
+        "Execute deployment",
+        "Verify health endpoints",
+        "Monitor logs for errors"
+    ],
+    "general": [
+        "Read relevant Skill Manual",
+        "Analyze requirements",
+        "Execute task",
+        "Verify output",
+        "Report completion"
+    ]
+}
+
+# === TASK LISTING ===
+TASK_COLUMNS = (
+    "id", "title", "description", "intent_keywords", "status", "skill_manual_id",
+    "checklist", "execution_log", "errors", "rca_log",
+    "created_at", "updated_at", "completed_at", "version",
+)
+TASK_PAGE_LIMIT = 50      # default page size
+TASK_PAGE_MAX = 500       # hard cap per page
+
+# Hot statements live here, and in the scheduler, ledger and pattern series
+# modules, so services.query_plans audits the SQL that actually runs.
+TASK_SQL = "SELECT * FROM tasks WHERE id = ?"
+TASK_LIST_SQL = "SELECT * FROM tasks ORDER BY created_at DESC"
+TASK_LIST_BY_STATUS_SQL = "SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC"
+
+def encode_task_cursor(created_at: str, task_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) ordering."""
+    raw = json.dumps([created_at, task_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_task_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return str(created_at), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+def task_page_query(columns: Sequence[str], status: Optional[str] = None,
+                    after: Optional[Tuple[str, int]] = None, limit: int = TASK_PAGE_LIMIT) -> Tuple[str, list]:
+    """SQL and parameters for a list_tasks_page read: `limit` rows after the (created_at, id) key `after`."""
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if after:
+        where.append("(created_at, id) < (?, ?)")
+        params.extend(after)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    sql = f"SELECT {', '.join(columns)} FROM tasks {where_sql} ORDER BY created_at DESC, id DESC LIMIT ?"
+    return sql, [*params, limit]
+
+# === SKILL MANUAL SEARCH ===
+SKILL_SEARCH_LIMIT = 5
+RELATED_SKILL_LIMIT = 3            # extra manuals the pre-task hook hands over
+SKILL_SEARCH_MAX_TERMS = 32         # long task descriptions are cut to their first distinct terms
+# bm25 column weights: name, category, content, keywords
+SKILL_SEARCH_WEIGHTS = (10.0, 2.0, 1.0, 5.0)
+
+def skill_query_terms(text: str) -> List[str]:
+    """Distinct search terms of free text, in order, capped at SKILL_SEARCH_MAX_TERMS."""
+    terms = []
+    for term in tokenize(text):
+        if len(term) > 1 and term not in terms:
+            terms.append(term)
+            if len(terms) == SKILL_SEARCH_MAX_TERMS:
+                break
+    return terms
+
+def build_fts_query(text: str) -> str:
+    """Turn free text into an FTS5 OR-query of quoted terms (no FTS syntax leaks through)."""
+    return " OR ".join(f'"{t}"' for t in skill_query_terms(text))
+
+# === WORKER LEASES ===
+LEASE_SECONDS = 30.0      # a claimed task is handed to another worker if not renewed in time
+HEARTBEAT_DEADLINE_SECONDS = 300.0      # silence after which a running task is presumed dead
+# Per-category overrides, for categories whose steps legitimately block for long
+HEARTBEAT_DEADLINES: Dict[str, float] = {
+    "scraping": 600.0,
+    "recon": 900.0,
+    "deployment": 900.0,
+}
+EXPIRED_LEASES_SQL = "SELECT task_id FROM execution_state WHERE lease_expires_at < ?"
+
+def reap_query(deadlines: Dict[str, float], default_deadline: float, now: float) -> Tuple[str, Dict[str, Any]]:
+    """
+    SQL and parameters of reap_stale_tasks' requeue. Heartbeats are UTC in
+    CURRENT_TIMESTAMP's format (sql_timestamp), so the cutoffs are too.
+    """
+    params: Dict[str, Any] = {
+        "stamp": datetime.fromtimestamp(now).isoformat(),
+        "default": sql_timestamp(now - default_deadline),
+        # Loosest cutoff: bounds the index range scan
+        "latest": sql_timestamp(now - min([default_deadline, *deadlines.values()])),
+    }
+    cases = []
+    for i, (category, seconds) in enumerate(sorted(deadlines.items())):
+        params[f"cat{i}"] = category
+        params[f"cut{i}"] = sql_timestamp(now - seconds)
+        cases.append(f"WHEN :cat{i} THEN :cut{i}")
+    cutoff = f"CASE {CATEGORY_SQL} {' '.join(cases)} ELSE :default END" if cases else ":default"
+    sql = f'''
+        UPDATE tasks SET status = 'pending', updated_at = :stamp
+        WHERE id IN (
+            SELECT s.task_id FROM execution_state s JOIN tasks t ON t.id = s.task_id
+            WHERE s.last_heartbeat < :latest AND s.is_paused = 0
+              AND t.status IN ('running', 'in_progress')
+              AND s.last_heartbeat < {cutoff}
+        )
+        RETURNING id
+    '''
+    return sql, params
+
+# === THREE-TIER MEMORY AND STATE ===
+TIER1_SQL = "SELECT * FROM memory_tier1_plans WHERE task_id = ?"
+TIER2_SQL = "SELECT * FROM memory_tier2_context WHERE task_id = ?"
+TIER3_SQL = "SELECT * FROM memory_tier3_checklists WHERE task_id = ? ORDER BY order_index"
+TIER3_DELETE_SQL = "DELETE FROM memory_tier3_checklists WHERE task_id = ?"
+EXECUTION_STATE_SQL = "SELECT * FROM execution_state WHERE task_id = ?"
+
+# === SKILL MANUALS AND PATTERNS ===
+SKILL_MANUALS_BY_CATEGORY_SQL = "SELECT * FROM skill_manuals WHERE category = ?"
+PATTERN_SQL = "SELECT * FROM execution_patterns WHERE pattern_type = ?"
 
 # === SWP-005: ANTI-HALLUCINATION VERIFICATION HOOK ===
 VERIFICATION_PROTOCOLS = {
@@ -31,14 +206,20 @@ VERIFICATION_PROTOCOLS = {
         "description": "API 키 존재 여부 확인",
         "source_of_truth": "/home/hakkocap/.nanobot/config.json",  
         "method": "file_read",
+        "timeout": 1.0,
+        "allowed_targets": [],
     },
     "file_existence": {
         "description": "파일 존재 확인",
         "method": "ls_check",
+        "timeout": 1.0,
+        "allowed_targets": [],      # directories API callers may check under
     },
     "service_status": {
         "description": "서비스 상태 확인", 
         "method": "curl_health",
+        "timeout": 3.0,
+        "allowed_targets": [],      # URL prefixes API callers may probe
     }
 }
 
@@ -59,260 +240,258 @@ class VerificationResult:
 class SWPEngine:
     """Sovereign Workflow Protocol Execution Engine"""
     
-    def __init__(self):
-        init_db()
-        self.db_path = DB_PATH
+    def __init__(self, db_path: Optional[Path] = None, events: Optional[EventBus] = None,
+                 state_flush_interval: float = STATE_FLUSH_SECONDS,
+                 category_caps: Optional[Dict[str, int]] = None):
+        self.db_path = Path(db_path) if db_path else DB_PATH
+        ensure_db(self.db_path)
+        self.db = ConnectionManager(self.db_path, observer=DB_METRICS)
+        self.events = events or EVENT_BUS
+        self.skill_cache = SkillManualCache(self.db)
+        self.protocols = ProtocolRunner(VERIFICATION_PROTOCOLS)
+        self.rca = RCAClassifier(self.db)
+        self.pattern_series = PatternSeries(self.db)
+        self.state_buffer = ExecutionStateBuffer(self.db, state_flush_interval)
+        self.ledger = LedgerArchive(self.db, archive_path_for(self.db_path))
+        self.scheduler = TaskScheduler(self.db, category_caps)
+    
+    def close(self):
+        """Close all pooled connections."""
+        self.protocols.close()
+        self.state_buffer.close()
+        self.db.close_all()
     
     # === PRE-TASK HOOK: LOAD SKILL MANUAL ===
     def load_skill_manual(self, task_description: str) -> Optional[Dict]:
         """Find and load relevant skill manual based on keywords."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
         # Find matching keywords
-        matched_category = None
-        for category, keywords in INTENT_KEYWORDS.items():
-            for kw in keywords:
-                if kw.lower() in task_description.lower():
-                    matched_category = category
-                    break
-            if matched_category:
-                break
+        categories = INTENT_MATCHER.classify(task_description)["categories"]
+        matched_category = categories[0] if categories else None
         
-        # Load manual if exists
+        # Load manual if exists: best full-text match in the category, else the newest.
+        # Ranked in memory over the cached category, so distinct descriptions still hit the cache.
         if matched_category:
-            c.execute(
-                "SELECT * FROM skill_manuals WHERE category = ? ORDER BY updated_at DESC LIMIT 1",
-                (matched_category,)
+            index = self.skill_cache.get_or_load(
+                ("index", matched_category),
+                lambda: SkillIndex(self._query_skill_manuals(matched_category), SKILL_SEARCH_WEIGHTS)
             )
-            row = c.fetchone()
-            if row:
-                manual = dict(row)
-                conn.close()
-                return manual
+            return index.best(skill_query_terms(task_description)) or index.newest()
         
-        conn.close()
         return None
     
     # === INTENT PARSER: GENERATE CHECKLIST ===
     def parse_intent(self, captain_intent: str) -> Dict[str, Any]:
         """Parse Captain's intent and generate dynamic checklist."""
-        intent_lower = captain_intent.lower()
-        
-        # Detect task type
-        task_type = "general"
-        for category, keywords in INTENT_KEYWORDS.items():
-            if any(kw in intent_lower for kw in keywords):
-                task_type = category
-                break
-        
-        # Generate base checklist by type
-        base_checklists = {
-            "coding": [
-                "Read relevant Skill Manual",
-                "Verify requirements & acceptance criteria",
-                "Set up development environment",
-                "Write core logic",
-                "Add error handling",
-                "Write unit tests",
-                "Verify implementation against requirements"
-            ],
-            "scraping": [
-                "Read relevant Skill Manual",
-                "Identify target URL structure",
-                "Check robots.txt compliance",
-                "Implement rate limiting",
-                "Handle edge cases & errors",
-                "Store data in required format",
-                "Verify data integrity"
-            ],
-            "recon": [
-                "Read relevant Skill Manual",
-                "Define reconnaissance scope",
-                "Gather OSINT sources",
-                "Document findings",
-                "Cross-verify information"
-            ],
-            "deployment": [
-                "Read relevant Skill Manual",
-                "Verify build passes tests",
-                "Check environment variables",
-                "Execute deployment",
-                "Verify health endpoints",
-                "Monitor logs for errors"
-            ],
-            "general": [
-                "Read relevant Skill Manual",
-                "Analyze requirements",
-                "Execute task",
-                "Verify output",
-                "Report completion"
-            ]
-        }
-        
+        return self._intent_from_match(INTENT_MATCHER.classify(captain_intent))
+    
+    def parse_intents(self, intents: List[str]) -> List[Dict[str, Any]]:
+        """Parse a batch of intents (bulk task import)."""
+        return [self._intent_from_match(m) for m in INTENT_MATCHER.classify_many(intents)]
+    
+    @staticmethod
+    def _intent_from_match(match: Dict[str, Any]) -> Dict[str, Any]:
+        task_type = match["task_type"]
         return {
             "task_type": task_type,
-            "checklist": base_checklists.get(task_type, base_checklists["general"]),
-            "detected_keywords": [kw for kw, words in INTENT_KEYWORDS.items() 
-                                 if any(w in intent_lower for w in words)]
+            "checklist": BASE_CHECKLISTS.get(task_type, BASE_CHECKLISTS["general"]),
+            "detected_keywords": match["categories"]
         }
     
     # === POST-TASK VERIFICATION HOOK ===
     def verify_task(self, task_id: int, output: str) -> Dict[str, Any]:
         """Mandatory verification step - anti-hallucination."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        task = dict(c.fetchone())
-        
-        verification_results = {
-            "task_id": task_id,
-            "verified": True,
-            "warnings": [],
-            "errors": []
-        }
-        
-        # Check 1: Is output empty?
-        if not output or len(output.strip()) < 10:
-            verification_results["verified"] = False
-            verification_results["errors"].append("Output is empty or too short")
-        
-        # Check 2: Does output match task description?
-        if task.get("description"):
-            task_words = set(task["description"].lower().split())
-            output_words = set(output.lower().split())
-            overlap = len(task_words & output_words)
-            if overlap < 3:
-                verification_results["warnings"].append(
-                    f"Low keyword overlap between task and output ({overlap} matches)"
-                )
-        
-        # Check 3: Error indicators in output
-        error_indicators = ["error", "failed", "exception", "traceback", "cannot", "unable"]
-        found_errors = [w for w in error_indicators if w in output.lower()]
-        if found_errors:
-            verification_results["warnings"].append(f"Potential errors detected: {found_errors}")
+        verifier = self.start_verification(task_id)
+        verifier.feed(output or "")
+        return self.finish_verification(verifier)
+
+    def verify_task_stream(self, task_id: int, chunks: Iterable[str]) -> Dict[str, Any]:
+        """
+        Verify output as it arrives, in one pass with bounded memory.
+        Stops consuming `chunks` as soon as the verdict can no longer change.
+        """
+        verifier = self.start_verification(task_id)
+        for chunk in chunks:
+            if verifier.feed(chunk):
+                break
+        results = self.finish_verification(verifier)
+        results["stopped_early"] = verifier.stopped_early
+        results["chars_scanned"] = verifier.chars_seen
+        return results
+
+    def start_verification(self, task_id: int) -> OutputVerifier:
+        with self.db.read() as c:
+            c.execute("SELECT description FROM tasks WHERE id = ?", (task_id,))
+            row = c.fetchone()
+        return OutputVerifier(task_id, row["description"] if row else None)
+
+    def finish_verification(self, verifier: OutputVerifier) -> Dict[str, Any]:
+        """Build the results from a fed verifier and record the new task status."""
+        verification_results = verifier.finish()
+        with self.db.transaction() as c:
+            new_status = self._record_verification(c, verifier.task_id, verification_results)
+        self.events.publish("task_status", {"id": verifier.task_id, "status": new_status})
         
-        # Update task status
+        return verification_results
+
+    @staticmethod
+    def _record_verification(c, task_id: int, verification_results: Dict[str, Any]) -> str:
+        """Update task status from a verdict; returns the new status."""
         new_status = "completed" if verification_results["verified"] else "verification"
         c.execute(
             "UPDATE tasks SET status = ?, updated_at = ? WHERE id = ?",
             (new_status, datetime.now().isoformat(), task_id)
         )
-        conn.commit()
-        conn.close()
-        
-        return verification_results
+        return new_status
+    
+    def verify_protocols(self, task_id: int, targets: Dict[str, List[str]],
+                         restricted: bool = False) -> Dict[str, Any]:
+        """
+        Triple-check claims against sources of truth. `targets` maps protocol
+        names from VERIFICATION_PROTOCOLS to what to check, e.g.
+        {"file_existence": ["/srv/app/main.py"], "api_key_check": []}.
+        All checks run concurrently; raises ValueError for unknown protocols.
+        `restricted` limits targets to each protocol's source_of_truth and
+        allowed_targets (PermissionError otherwise); set it for callers
+        outside the process.
+        """
+        checks = self.protocols.run(self.protocols.plan(targets, restricted))
+        result = VerificationResult()
+        self.protocols.summarize(checks, result)
+        return {"task_id": task_id, **result.to_dict(), "checks": checks}
     
     # === SELF-AUDIT & RCA ===
     def perform_rca(self, task_id: int, error_message: str) -> Dict[str, Any]:
         """Root Cause Analysis when errors detected."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Analyze error patterns
-        root_cause = "unknown"
-        correction = ""
-        
-        error_lower = error_message.lower()
-        
-        if "timeout" in error_lower or "connection" in error_lower:
-            root_cause = "Network/Connectivity Issue"
-            correction = "Add retry logic with exponential backoff"
-        elif "permission" in error_lower or "access denied" in error_lower:
-            root_cause = "Permission/Access Issue"
-            correction = "Verify credentials and access rights"
-        elif "syntax" in error_lower or "parse" in error_lower:
-            root_cause = "Syntax/Parse Error"
-            correction = "Review code syntax and input format"
-        elif "memory" in error_lower or "resource" in error_lower:
-            root_cause = "Resource Exhaustion"
-            correction = "Optimize memory usage, add limits"
-        else:
-            root_cause = "Unknown Error"
-            correction = "Review logs for details"
-        
+        return self.perform_rca_batch([{"task_id": task_id, "error_message": error_message}])[0]
+
+    def perform_rca_batch(self, errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Classify many errors and log them all to the disciplinary ledger in one
+        transaction. Each item needs `task_id` and `error_message`; a task that
+        appears more than once keeps the RCA of its last error.
+        """
+        classified = self._classify_errors(errors)
+        with self.db.transaction() as c:
+            record_ids = self._record_rca(c, classified)
+        return self._publish_rca(classified, record_ids)
+
+    def _classify_errors(self, errors: List[Dict[str, Any]]) -> List[Tuple[int, str, str, str]]:
+        return [
+            (e["task_id"], e["error_message"], *self.rca.classify(e["error_message"]))
+            for e in errors
+        ]
+
+    @staticmethod
+    def _record_rca(c, classified: List[Tuple[int, str, str, str]]) -> List[int]:
+        """Ledger entries and 'correcting' status for classified errors; returns the ledger ids."""
+        now = datetime.now().isoformat()
+        record_ids = []
         # Log to disciplinary ledger
-        c.execute('''
-            INSERT INTO disciplinary_ledger 
-            (task_id, error_type, error_message, root_cause, correction_action)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (task_id, root_cause, error_message, root_cause, correction))
+        for task_id, error_message, root_cause, correction in classified:
+            c.execute('''
+                INSERT INTO disciplinary_ledger 
+                (task_id, error_type, error_message, root_cause, correction_action)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (task_id, root_cause, error_message, root_cause, correction))
+            record_ids.append(c.lastrowid)
         
         # Update task status
-        c.execute(
+        latest = {task_id: (root_cause, correction) for task_id, _, root_cause, correction in classified}
+        c.executemany(
             "UPDATE tasks SET status = 'correcting', rca_log = ?, updated_at = ? WHERE id = ?",
-            (json.dumps({"root_cause": root_cause, "correction": correction}),
-             datetime.now().isoformat(), task_id)
+            [(json.dumps({"root_cause": root_cause, "correction": correction}), now, task_id)
+             for task_id, (root_cause, correction) in latest.items()]
         )
-        
-        conn.commit()
-        conn.close()
-        
-        return {
-            "task_id": task_id,
-            "root_cause": root_cause,
-            "correction": correction,
-            "disciplinary_logged": True
-        }
+        return record_ids
+
+    def _publish_rca(self, classified: List[Tuple[int, str, str, str]], record_ids: List[int]) -> List[Dict[str, Any]]:
+        """After the commit: events, opportunistic ledger archiving, and the per-error results."""
+        for record_id, (task_id, _, root_cause, correction) in zip(record_ids, classified):
+            self.events.publish("rca_logged", {
+                "id": record_id, "task_id": task_id, "error_type": root_cause,
+                "root_cause": root_cause, "correction_action": correction
+            })
+        for task_id in dict.fromkeys(task_id for task_id, *_ in classified):
+            self.events.publish("task_status", {"id": task_id, "status": "correcting"})
+        self.ledger.maybe_archive()
+        
+        return [
+            {
+                "task_id": task_id,
+                "root_cause": root_cause,
+                "correction": correction,
+                "disciplinary_logged": True
+            }
+            for task_id, _, root_cause, correction in classified
+        ]
+
+    def get_rca_rules(self) -> List[Dict]:
+        return self.rca.rules()
+
+    def add_rca_rule(self, pattern: str, root_cause: str, correction_action: str = "",
+                     priority: int = 100) -> int:
+        """
+        Add a classification rule; raises ValueError for a pattern that won't
+        compile on its own or together with the enabled rules.
+        """
+        with self.db.transaction() as c:
+            RCAClassifier.validate_with_rules(c, pattern)
+            c.execute('''
+                INSERT INTO rca_rules (priority, pattern, root_cause, correction_action)
+                VALUES (?, ?, ?, ?)
+            ''', (priority, pattern, root_cause, correction_action))
+            rule_id = c.lastrowid
+        self.rca.invalidate()
+        return rule_id
     
     # === THREE-TIER MEMORY ===
+    @staticmethod
+    def _bump_task_version(c, task_id: int):
+        """Invalidate the task's ETag after a write to one of its child tables."""
+        c.execute("UPDATE tasks SET version = version + 1 WHERE id = ?", (task_id,))
+    
     def save_memory_tier1(self, task_id: int, title: str, plan_content: str, phase: str):
         """Save Project Plans."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO memory_tier1_plans (task_id, title, plan_content, phase)
-            VALUES (?, ?, ?, ?)
-        ''', (task_id, title, plan_content, phase))
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as c:
+            c.execute('''
+                INSERT INTO memory_tier1_plans (task_id, title, plan_content, phase)
+                VALUES (?, ?, ?, ?)
+            ''', (task_id, title, plan_content, phase))
+            self._bump_task_version(c, task_id)
     
     def save_memory_tier2(self, task_id: int, context_key: str, context_value: str):
         """Save Context Notes."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT OR REPLACE INTO memory_tier2_context (task_id, context_key, context_value, updated_at)
-            VALUES (?, ?, ?, ?)
-        ''', (task_id, context_key, context_value, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as c:
+            c.execute('''
+                INSERT OR REPLACE INTO memory_tier2_context (task_id, context_key, context_value, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (task_id, context_key, context_value, datetime.now().isoformat()))
+            self._bump_task_version(c, task_id)
     
     def save_memory_tier3(self, task_id: int, checklist: List[str]):
         """Save Active Checklists."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("DELETE FROM memory_tier3_checklists WHERE task_id = ?", (task_id,))
-        for i, item in enumerate(checklist):
-            c.execute('''
+        with self.db.transaction() as c:
+            c.execute(TIER3_DELETE_SQL, (task_id,))
+            c.executemany('''
                 INSERT INTO memory_tier3_checklists (task_id, checklist_item, order_index)
                 VALUES (?, ?, ?)
-            ''', (task_id, item, i))
-        conn.commit()
-        conn.close()
+            ''', [(task_id, item, i) for i, item in enumerate(checklist)])
+            self._bump_task_version(c, task_id)
     
     def get_task_memory(self, task_id: int) -> Dict[str, Any]:
         """Load all three tiers for a task."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        # Tier 1: Plans
-        c.execute("SELECT * FROM memory_tier1_plans WHERE task_id = ?", (task_id,))
-        plans = [dict(r) for r in c.fetchall()]
-        
-        # Tier 2: Context
-        c.execute("SELECT * FROM memory_tier2_context WHERE task_id = ?", (task_id,))
-        context = {r["context_key"]: r["context_value"] for r in c.fetchall()}
-        
-        # Tier 3: Checklist
-        c.execute("SELECT * FROM memory_tier3_checklists WHERE task_id = ? ORDER BY order_index", (task_id,))
-        checklist = [{"item": r["checklist_item"], "completed": bool(r["completed"])} for r in c.fetchall()]
-        
-        conn.close()
+        with self.db.read() as c:
+            # Tier 1: Plans
+            c.execute(TIER1_SQL, (task_id,))
+            plans = [dict(r) for r in c.fetchall()]
+            
+            # Tier 2: Context
+            c.execute(TIER2_SQL, (task_id,))
+            context = {r["context_key"]: r["context_value"] for r in c.fetchall()}
+            
+            # Tier 3: Checklist
+            c.execute(TIER3_SQL, (task_id,))
+            checklist = [{"item": r["checklist_item"], "completed": bool(r["completed"])} for r in c.fetchall()]
         
         return {
             "tier1_plans": plans,
@@ -322,155 +501,488 @@ class SWPEngine:
     
     # === STATE PERSISTENCE ===
     def save_execution_state(self, task_id: int, current_step: str, step_index: int):
-        """Save pause point for resume."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT OR REPLACE INTO execution_state 
-            (task_id, current_step, step_index, last_resume_point, last_heartbeat)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (task_id, current_step, step_index, current_step, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        """Save pause point for resume. Buffered; see ExecutionStateBuffer for the durability bound."""
+        self.state_buffer.put(task_id, {
+            "current_step": current_step,
+            "step_index": step_index,
+            "last_resume_point": current_step,
+            "last_heartbeat": sql_timestamp(),
+        })
+        self.events.publish("task_state", {"task_id": task_id, "current_step": current_step, "step_index": step_index})
     
     def load_execution_state(self, task_id: int) -> Optional[Dict]:
-        """Resume from last state."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM execution_state WHERE task_id = ?", (task_id,))
-        row = c.fetchone()
-        conn.close()
-        return dict(row) if row else None
+        """Resume from last state, including saves not yet flushed."""
+        return self._read_execution_state(task_id)
+
+    def _read_execution_state(self, task_id: int) -> Optional[Dict]:
+        buffered = self.state_buffer.get(task_id)
+        with self.db.read() as c:
+            c.execute(EXECUTION_STATE_SQL, (task_id,))
+            row = c.fetchone()
+        if not buffered:
+            return dict(row) if row else None
+        state = dict(row) if row else {"id": None, "task_id": task_id, "is_paused": 0}
+        state.update(buffered)
+        return state
+
+    def flush_execution_state(self) -> int:
+        return self.state_buffer.flush()
+
+    def get_state_seq(self, task_id: int) -> int:
+        """In-process change counter for a task's buffered state (part of its ETag)."""
+        return self.state_buffer.seq(task_id)
+    
+    # === WORKER LEASES ===
+    def claim_tasks(self, owner: str, limit: int = 1, lease_seconds: float = LEASE_SECONDS) -> List[Dict]:
+        """
+        Atomically move up to `limit` pending tasks to running under a lease
+        held by `owner`, in scheduler order (shortest expected job first,
+        with aging and category caps). Tasks whose lease lapsed (crashed
+        worker) go back to pending first. Safe across processes: the whole claim holds the
+        writer lock, so no task is handed out twice.
+        """
+        now = time.time()
+        stamp = datetime.now().isoformat()
+        with self.db.transaction() as c:
+            requeued = self._release_expired_leases(c, now, stamp)
+            picked = self.scheduler.pick(c, limit)
+            marks = ",".join("?" * len(picked))
+            c.execute(f'''
+                UPDATE tasks SET status = 'running', updated_at = ?
+                WHERE status = 'pending' AND id IN ({marks})
+                RETURNING id, title, description, intent_keywords, created_at
+            ''', (stamp, *picked))
+            order = {task_id: i for i, task_id in enumerate(picked)}
+            claimed = sorted((dict(r) for r in c.fetchall()), key=lambda t: order[t["id"]])
+            c.executemany('''
+                INSERT INTO execution_state (task_id, lease_owner, lease_expires_at, last_heartbeat)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET
+                    lease_owner = excluded.lease_owner,
+                    lease_expires_at = excluded.lease_expires_at,
+                    last_heartbeat = excluded.last_heartbeat
+            ''', [(t["id"], owner, now + lease_seconds, sql_timestamp(now)) for t in claimed])
+            # Requeued tasks carry their checkpoint so the next worker resumes there
+            c.execute(f'''
+                SELECT task_id, current_step, step_index, last_resume_point FROM execution_state
+                WHERE task_id IN ({marks}) AND (step_index > 0 OR last_resume_point IS NOT NULL)
+            ''', picked)
+            checkpoints = {r["task_id"]: dict(r) for r in c.fetchall()}
+        for task_id in requeued:
+            self.events.publish("task_status", {"id": task_id, "status": "pending"})
+        for task in claimed:
+            task["lease_owner"] = owner
+            task["resume"] = checkpoints.get(task["id"])
+            self.events.publish("task_status", {"id": task["id"], "status": "running"})
+        return claimed
+
+    @staticmethod
+    def _release_expired_leases(c, now: float, stamp: str) -> List[int]:
+        c.execute(EXPIRED_LEASES_SQL, (now,))
+        expired = [r["task_id"] for r in c.fetchall()]
+        if not expired:
+            return []
+        marks = ",".join("?" * len(expired))
+        c.execute(f"UPDATE execution_state SET lease_owner = NULL, lease_expires_at = NULL WHERE task_id IN ({marks})",
+                  expired)
+        c.execute(f"UPDATE tasks SET status = 'pending', updated_at = ? WHERE status = 'running' AND id IN ({marks}) "
+                  "RETURNING id", (stamp, *expired))
+        return [r["id"] for r in c.fetchall()]
+
+    def reap_stale_tasks(self, deadlines: Optional[Dict[str, float]] = None,
+                         default_deadline: float = HEARTBEAT_DEADLINE_SECONDS) -> List[int]:
+        """
+        Requeue running tasks whose last heartbeat is older than their
+        category's deadline (seconds). Paused tasks are left alone. The
+        checkpoint (step_index, last_resume_point) stays in execution_state
+        and is handed to the next claimer. Returns the requeued task ids.
+        """
+        deadlines = HEARTBEAT_DEADLINES if deadlines is None else deadlines
+        sql, params = reap_query(deadlines, default_deadline, time.time())
+        with self.db.transaction() as c:
+            c.execute(sql, params)
+            reaped = [r["id"] for r in c.fetchall()]
+            if reaped:
+                c.execute(f'''
+                    UPDATE execution_state SET lease_owner = NULL, lease_expires_at = NULL
+                    WHERE task_id IN ({",".join("?" * len(reaped))})
+                ''', reaped)
+        for task_id in reaped:
+            self.events.publish("task_status", {"id": task_id, "status": "pending"})
+        return reaped
+
+    def get_queue(self, limit: int = QUEUE_VIEW_LIMIT) -> Dict[str, Any]:
+        """Pending tasks in the order workers will claim them."""
+        return self.scheduler.queue(limit)
+
+    def renew_leases(self, owner: str, task_ids: Sequence[int], lease_seconds: float = LEASE_SECONDS) -> List[int]:
+        """Heartbeat: extend `owner`'s leases. Returns the ids it no longer holds."""
+        if not task_ids:
+            return []
+        now = time.time()
+        with self.db.transaction() as c:
+            marks = ",".join("?" * len(task_ids))
+            c.execute(f'''
+                UPDATE execution_state SET lease_expires_at = ?, last_heartbeat = ?
+                WHERE lease_owner = ? AND task_id IN ({marks})
+                RETURNING task_id
+            ''', (now + lease_seconds, sql_timestamp(now), owner, *task_ids))
+            held = {r["task_id"] for r in c.fetchall()}
+        return [t for t in task_ids if t not in held]
+
+    def release_lease(self, task_id: int, owner: str) -> bool:
+        """Drop `owner`'s lease on a task. False if it had already lapsed or moved on."""
+        with self.db.transaction() as c:
+            return self._release_lease(c, task_id, owner)
+
+    @staticmethod
+    def _release_lease(c, task_id: int, owner: str) -> bool:
+        c.execute('''
+            UPDATE execution_state SET lease_owner = NULL, lease_expires_at = NULL
+            WHERE task_id = ? AND lease_owner = ?
+        ''', (task_id, owner))
+        return c.rowcount > 0
+
+    def complete_task(self, task_id: int, owner: str, output: Optional[str] = None,
+                      error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        A worker's end of a task: verify `output` (or run RCA on `error`),
+        record the new status and drop `owner`'s lease in one transaction, so
+        a crash can't leave the task running without a lease. Returns the
+        verification or RCA result, or None (nothing written) if the lease
+        had already lapsed or moved on.
+        """
+        if error is None:
+            verifier = self.start_verification(task_id)
+            verifier.feed(output or "")
+            results = verifier.finish()
+        else:
+            classified = self._classify_errors([{"task_id": task_id, "error_message": error}])
+        with self.db.transaction() as c:
+            if not self._release_lease(c, task_id, owner):
+                return None
+            if error is None:
+                new_status = self._record_verification(c, task_id, results)
+            else:
+                record_ids = self._record_rca(c, classified)
+        if error is None:
+            self.events.publish("task_status", {"id": task_id, "status": new_status})
+            return results
+        return self._publish_rca(classified, record_ids)[0]
     
     # === TASK MANAGEMENT ===
     def create_task(self, title: str, description: str) -> int:
         """Create new task with intent parsing."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        intent = self.parse_intent(description)
-        checklist_json = json.dumps(intent["checklist"])
-        keywords_json = ",".join(intent["detected_keywords"])
-        
-        c.execute('''
-            INSERT INTO tasks (title, description, intent_keywords, checklist, status)
-            VALUES (?, ?, ?, ?, 'pending')
-        ''', (title, description, keywords_json, checklist_json))
-        
-        task_id = c.lastrowid
-        conn.commit()
-        conn.close()
-        
-        # Save to memory tiers
-        self.save_memory_tier3(task_id, intent["checklist"])
-        
-        return task_id
+        return self.create_tasks([{"title": title, "description": description}])[0]
+    
+    def create_tasks(self, tasks: List[Dict[str, str]]) -> List[int]:
+        """
+        Create many tasks ({"title", "description"}) in one transaction.
+        Tier-3 checklists are written with a single executemany. Returns ids in input order.
+        """
+        intents = self.parse_intents([t["description"] for t in tasks])
+        task_ids = []
+        checklist_rows = []
+        
+        score = self.scheduler.score_sql("?", "CURRENT_TIMESTAMP")
+        
+        with self.db.transaction() as c:
+            for task, intent in zip(tasks, intents):
+                keywords = ",".join(intent["detected_keywords"])
+                c.execute(f'''
+                    INSERT INTO tasks (title, description, intent_keywords, checklist, status, queue_score)
+                    VALUES (?, ?, ?, ?, 'pending', {score})
+                ''', (task["title"], task["description"], keywords, json.dumps(intent["checklist"]),
+                      task_category(keywords)))
+                task_id = c.lastrowid
+                task_ids.append(task_id)
+                checklist_rows.extend((task_id, item, i) for i, item in enumerate(intent["checklist"]))
+            
+            # Save to memory tiers
+            c.executemany('''
+                INSERT INTO memory_tier3_checklists (task_id, checklist_item, order_index)
+                VALUES (?, ?, ?)
+            ''', checklist_rows)
+        
+        for task_id, task, intent in zip(task_ids, tasks, intents):
+            self.events.publish("task_created", {
+                "id": task_id, "title": task["title"], "status": "pending",
+                # Summary only; clients fetch /api/tasks/{id} for the full view
+                "description": task["description"][:200],
+                "checklist": json.dumps(intent["checklist"]),
+            })
+        return task_ids
     
     def get_task(self, task_id: int) -> Optional[Dict]:
         """Get task details."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = c.fetchone()
-        conn.close()
+        with self.db.read() as c:
+            c.execute(TASK_SQL, (task_id,))
+            row = c.fetchone()
         return dict(row) if row else None
     
+    def get_task_version(self, task_id: int) -> Optional[int]:
+        """Current version counter of a task (cheap ETag check)."""
+        with self.db.read() as c:
+            c.execute("SELECT version FROM tasks WHERE id = ?", (task_id,))
+            row = c.fetchone()
+        return row["version"] if row else None
+    
+    def get_task_view(self, task_id: int) -> Optional[Dict]:
+        """Task with its three memory tiers and execution state, read from one snapshot."""
+        with self.db.snapshot():
+            task = self.get_task(task_id)
+            if not task:
+                return None
+            task["memory"] = self.get_task_memory(task_id)
+            task["execution_state"] = self._read_execution_state(task_id)
+        return task
+    
     def list_tasks(self, status: Optional[str] = None) -> List[Dict]:
         """List all tasks, optionally filtered by status."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        if status:
-            c.execute("SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC", (status,))
-        else:
-            c.execute("SELECT * FROM tasks ORDER BY created_at DESC")
-        
-        rows = c.fetchall()
-        conn.close()
+        with self.db.read() as c:
+            if status:
+                c.execute(TASK_LIST_BY_STATUS_SQL, (status,))
+            else:
+                c.execute(TASK_LIST_SQL)
+            rows = c.fetchall()
         return [dict(r) for r in rows]
     
+    def list_tasks_page(self, status: Optional[str] = None, fields: Optional[Sequence[str]] = None,
+                        limit: int = TASK_PAGE_LIMIT, cursor: Optional[str] = None,
+                        with_total: bool = False) -> Dict[str, Any]:
+        """
+        One page of tasks, newest first, using keyset pagination on (created_at, id).
+        `fields` projects columns (id and created_at are always included for the cursor);
+        the total count is only computed when `with_total` is set.
+        """
+        if fields:
+            unknown = [f for f in fields if f not in TASK_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown task fields: {unknown}")
+            columns = ["id", "created_at"] + [f for f in fields if f not in ("id", "created_at")]
+        else:
+            columns = list(TASK_COLUMNS)
+        limit = max(1, min(limit, TASK_PAGE_MAX))
+        after = decode_task_cursor(cursor) if cursor else None
+        
+        with self.db.read() as c:
+            # One extra row tells whether there is a next page
+            c.execute(*task_page_query(columns, status, after, limit + 1))
+            rows = c.fetchall()
+            total = None
+            if with_total:
+                if status:
+                    c.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,))
+                else:
+                    c.execute("SELECT COUNT(*) FROM tasks")
+                total = c.fetchone()[0]
+        
+        items = [dict(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_task_cursor(last["created_at"], last["id"])
+        
+        page = {"items": items, "next_cursor": next_cursor}
+        if with_total:
+            page["total"] = total
+        return page
+    
     # === SKILL MANUAL CRUD ===
     def add_skill_manual(self, name: str, category: str, content: str, keywords: str = "") -> int:
         """Add new skill manual."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO skill_manuals (name, category, content, keywords)
-            VALUES (?, ?, ?, ?)
-        ''', (name, category, content, keywords))
-        manual_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as c:
+            c.execute('''
+                INSERT INTO skill_manuals (name, category, content, keywords)
+                VALUES (?, ?, ?, ?)
+            ''', (name, category, content, keywords))
+            manual_id = c.lastrowid
+        self.skill_cache.invalidate()
+        self.events.publish("skill_added", {
+            "id": manual_id, "name": name, "category": category, "content": content[:200]
+        })
         return manual_id
     
     def get_skill_manuals(self, category: Optional[str] = None) -> List[Dict]:
-        """List skill manuals."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
+        """List skill manuals (served from the skill cache)."""
+        return self.skill_cache.get_or_load(("category", category), lambda: self._query_skill_manuals(category))
+    
+    def _query_skill_manuals(self, category: Optional[str]) -> List[Dict]:
+        with self.db.read() as c:
+            if category:
+                c.execute(SKILL_MANUALS_BY_CATEGORY_SQL, (category,))
+            else:
+                c.execute("SELECT * FROM skill_manuals")
+            rows = c.fetchall()
+        return [dict(r) for r in rows]
+    
+    def search_skill_manuals(self, query: str, k: int = SKILL_SEARCH_LIMIT,
+                             category: Optional[str] = None) -> List[Dict]:
+        """
+        BM25-ranked skill manuals matching `query`, each with a content snippet.
+        Not cached: free-text queries rarely repeat and would push manuals out of the skill cache.
+        """
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+        return self._query_skill_search(fts_query, k, category)
+
+    def related_skill_manuals(self, task_description: str, k: int = RELATED_SKILL_LIMIT) -> List[Dict]:
+        """
+        The pre-task hook's other matching manuals, across categories. Ranked
+        in memory over the cached set of all manuals, like load_skill_manual,
+        so a new description costs no database read.
+        """
+        index = self.skill_cache.get_or_load(
+            ("index", None), lambda: SkillIndex(self._query_skill_manuals(None), SKILL_SEARCH_WEIGHTS)
+        )
+        return index.top(skill_query_terms(task_description), k)
+    
+    def _query_skill_search(self, fts_query: str, k: int, category: Optional[str]) -> List[Dict]:
+        sql = '''
+            SELECT m.*,
+                   bm25(skill_manuals_fts, ?, ?, ?, ?) AS score,
+                   snippet(skill_manuals_fts, 2, '[', ']', '…', 16) AS snippet
+            FROM skill_manuals_fts
+            JOIN skill_manuals m ON m.id = skill_manuals_fts.rowid
+            WHERE skill_manuals_fts MATCH ?
+        '''
+        params = [*SKILL_SEARCH_WEIGHTS, fts_query]
         if category:
-            c.execute("SELECT * FROM skill_manuals WHERE category = ?", (category,))
-        else:
-            c.execute("SELECT * FROM skill_manuals")
-        
-        rows = c.fetchall()
-        conn.close()
+            sql += " AND m.category = ?"
+            params.append(category)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(k)
+        
+        with self.db.read() as c:
+            c.execute(sql, params)
+            rows = c.fetchall()
         return [dict(r) for r in rows]
     
+    def get_skill_cache_stats(self) -> Dict[str, Any]:
+        """Skill cache size and hit rate."""
+        return self.skill_cache.stats()
+    
     # === DISCIPLINARY LEDGER ===
-    def get_disciplinary_records(self, task_id: Optional[int] = None) -> List[Dict]:
-        """Get disciplinary records."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        if task_id:
-            c.execute("SELECT * FROM disciplinary_ledger WHERE task_id = ?", (task_id,))
-        else:
-            c.execute("SELECT * FROM disciplinary_ledger ORDER BY created_at DESC")
-        
-        rows = c.fetchall()
-        conn.close()
-        return [dict(r) for r in rows]
+    def get_disciplinary_records(self, task_id: Optional[int] = None, days: Optional[int] = None,
+                                 include_archive: bool = False) -> List[Dict]:
+        """
+        Get disciplinary records, newest first. Without a task filter only the
+        last LEDGER_RECENT_DAYS are returned unless `days` says otherwise;
+        include_archive also reads entries moved to the archive database.
+        """
+        if days is None and not task_id:
+            days = LEDGER_RECENT_DAYS
+        return self.ledger.records(task_id, days, include_archive)
+
+    def resolve_disciplinary_record(self, record_id: int) -> bool:
+        """Mark a ledger entry resolved. False if no such (live) entry exists."""
+        with self.db.transaction() as c:
+            c.execute('''
+                UPDATE disciplinary_ledger
+                SET resolved = 1, resolved_at = COALESCE(resolved_at, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            ''', (record_id,))
+            found = c.rowcount > 0
+        if found:
+            self.events.publish("rca_resolved", {"id": record_id})
+            self.ledger.maybe_archive()
+        return found
+
+    def archive_disciplinary_records(self) -> Dict[str, int]:
+        """Move old and resolved entries to the archive now."""
+        return self.ledger.archive()
+
+    def get_ledger_summary(self, days: int = LEDGER_RETENTION_DAYS) -> List[Dict]:
+        return self.ledger.summary(days)
+
+    # === STATS ===
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Dashboard aggregates from stats_counters, which triggers keep current:
+        tasks by status, and all-time ledger entries by root cause and by
+        open/resolved. Cost is independent of history size.
+        """
+        with self.db.read() as c:
+            c.execute("SELECT name, key, value FROM stats_counters WHERE value != 0")
+            rows = c.fetchall()
+        stats: Dict[str, Any] = {"tasks_by_status": {}, "ledger_by_root_cause": {}, "ledger": {"open": 0, "resolved": 0}}
+        for row in rows:
+            stats.setdefault(row["name"], {})[row["key"]] = row["value"]
+        stats["tasks_total"] = sum(stats["tasks_by_status"].values())
+        stats["ledger_total"] = sum(stats["ledger"].values())
+        return stats
     
     # === PATTERN RECOGNITION ===
     def record_pattern(self, pattern_type: str, duration_minutes: float, success: bool, errors: List[str]):
-        """Record execution pattern for optimization."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Update or insert pattern
-        c.execute("SELECT * FROM execution_patterns WHERE pattern_type = ?", (pattern_type,))
-        existing = c.fetchone()
-        
-        if existing:
+        """
+        Record execution pattern for optimization. One UPSERT statement, so
+        concurrent writers can't lose each other's counts or sketch buckets.
+        A shifted estimate re-scores the category's pending tasks.
+        """
+        now = datetime.now()
+        with self.db.transaction() as c:
             c.execute('''
-                UPDATE execution_patterns 
-                SET avg_duration_minutes = (avg_duration_minutes * execution_count + ?) / (execution_count + 1),
+                INSERT INTO execution_patterns (
+                    pattern_type, avg_duration_minutes, success_rate, success_count,
+                    common_errors, execution_count, last_used, duration_sketch
+                )
+                VALUES (:type, :duration, :success, :success, :errors, 1, :now, json_object(:bucket, 1))
+                ON CONFLICT(pattern_type) DO UPDATE SET
+                    avg_duration_minutes = (COALESCE(avg_duration_minutes, 0) * execution_count + :duration)
+                                           / (execution_count + 1),
+                    success_count = success_count + :success,
+                    success_rate = CAST(success_count + :success AS REAL) / (execution_count + 1),
                     execution_count = execution_count + 1,
-                    last_used = ?,
-                    common_errors = ?
-                WHERE pattern_type = ?
-            ''', (duration_minutes, datetime.now().isoformat(), json.dumps(errors), pattern_type))
-        else:
-            c.execute('''
-                INSERT INTO execution_patterns (pattern_type, avg_duration_minutes, success_rate, common_errors, execution_count)
-                VALUES (?, ?, ?, ?, 1)
-            ''', (pattern_type, duration_minutes, 1.0 if success else 0.0, json.dumps(errors)))
-        
-        conn.commit()
-        conn.close()
-    
-    def get_optimization_hints(self, pattern_type: str) -> Optional[Dict]:
-        """Get optimization hints based on past patterns."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM execution_patterns WHERE pattern_type = ?", (pattern_type,))
-        row = c.fetchone()
-        conn.close()
-        return dict(row) if row else None
+                    last_used = :now,
+                    common_errors = :errors,
+                    duration_sketch = json_set(
+                        COALESCE(duration_sketch, '{}'), :path,
+                        COALESCE(json_extract(duration_sketch, :path), 0) + 1
+                    )
+                RETURNING avg_duration_minutes, execution_count, scored_minutes
+            ''', {
+                "type": pattern_type,
+                "duration": duration_minutes,
+                "success": 1 if success else 0,
+                "errors": json.dumps(errors),
+                "now": now.isoformat(),
+                "bucket": bucket_key(duration_minutes),
+                "path": f'$."{bucket_key(duration_minutes)}"',
+            })
+            estimate = tuple(c.fetchone())
+            self.pattern_series.record(c, pattern_type, duration_minutes, success, now.timestamp())
+            self.scheduler.refresh_estimate(c, pattern_type, *estimate)
+        self.pattern_series.maybe_rollup()
+    
+    def get_optimization_hints(self, pattern_type: str, window: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get optimization hints based on past patterns, including p50/p90/p99
+        durations. With a window ("1h", "24h", "7d") only recent executions
+        count; raises ValueError for a malformed window.
+        """
+        if window:
+            return self.pattern_series.window_stats(pattern_type, window)
+        with self.db.read() as c:
+            c.execute(PATTERN_SQL, (pattern_type,))
+            row = c.fetchone()
+        if not row:
+            return None
+        hints = dict(row)
+        sketch = json.loads(hints.pop("duration_sketch") or "{}")
+        for name, value in percentiles(sketch).items():
+            hints[f"{name}_duration_minutes"] = value
+        return hints
+
+# === PROCESS-WIDE ENGINE ===
+_engine: Optional[SWPEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> SWPEngine:
+    """Shared engine for routes and hooks; created on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SWPEngine()
+    return _engine
@@ -0,0 +1,67 @@
+"""
+SWP Event Bus
+Sovereign Workflow Protocol - In-Process Task Event Fan-Out
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+EVENT_QUEUE_SIZE = 1000     # per subscriber; overflow collapses into a single "resync"
+
+
+class EventBus:
+    """
+    Fan-out of engine write events to asyncio subscribers (SSE streams).
+    publish() is thread-safe: engine writes run on executor threads and hand
+    events to each subscriber's event loop.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: List[Tuple[asyncio.Queue, asyncio.AbstractEventLoop]] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Queue an event for every subscriber. Cheap when nobody listens."""
+        if not self._subscribers:
+            return
+        event = {"id": next(self._ids), "type": event_type, "data": data, "ts": time.time()}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block will unsubscribe
+                pass
+
+    def _offer(self, queue: asyncio.Queue, event: Dict[str, Any]):
+        if queue.full():
+            # Slow consumer: drop the backlog and tell it to re-fetch
+            while not queue.empty():
+                queue.get_nowait()
+            event = {"id": event["id"], "type": "resync", "data": {}, "ts": event["ts"]}
+        queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a queue on the running event loop."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append((queue, asyncio.get_running_loop()))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = [(q, l) for q, l in self._subscribers if q is not queue]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+# Process-wide bus shared by the engine and the SSE route
+EVENT_BUS = EventBus()
@@ -0,0 +1,61 @@
+"""
+SWP Intent Matcher
+Sovereign Workflow Protocol - Compiled Keyword Classification
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+_WORD = re.compile(r"\w+")
+
+
+class IntentMatcher:
+    """
+    Classifies text against a {category: [keywords]} map in a single pass.
+
+    The text is lower-cased and tokenized once; each distinct word is checked
+    against a prefix table built from the keyword map. Keywords therefore match at the
+    start of a word and may carry a suffix ("build" matches "building",
+    "deploy" matches "deployment"), but not in the middle of one ("ui" no
+    longer fires on "build", "api" on "capital").
+    Category priority follows the order of the keyword map.
+    """
+
+    def __init__(self, keyword_map: Mapping[str, Sequence[str]], default: str = "general"):
+        self.default = default
+        self.categories = list(keyword_map)
+        self._keyword_categories: Dict[str, List[int]] = {}
+        for index, (category, keywords) in enumerate(keyword_map.items()):
+            for kw in keywords:
+                self._keyword_categories.setdefault(kw.lower(), []).append(index)
+        # Shortest first: "db" is tried before "database" for the same word
+        self._prefix_lengths = sorted({len(kw) for kw in self._keyword_categories})
+        # Cheap reject for words that cannot start with any keyword
+        self._head_len = self._prefix_lengths[0]
+        self._heads = {kw[:self._head_len] for kw in self._keyword_categories}
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """Primary category, every matched category and the matched keywords (sorted)."""
+        matched = set()
+        keywords = set()
+        for word in set(_WORD.findall((text or "").lower())):
+            if word[:self._head_len] not in self._heads:
+                continue
+            for n in self._prefix_lengths:
+                if n > len(word):
+                    break
+                categories = self._keyword_categories.get(word[:n])
+                if categories:
+                    keywords.add(word[:n])
+                    matched.update(categories)
+
+        categories = [self.categories[i] for i in sorted(matched)]
+        return {
+            "task_type": categories[0] if categories else self.default,
+            "categories": categories,
+            "keywords": sorted(keywords),
+        }
+
+    def classify_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Classify a batch of texts (bulk task import)."""
+        return [self.classify(text) for text in texts]
@@ -0,0 +1,175 @@
+"""
+SWP Ledger Retention
+Sovereign Workflow Protocol - Disciplinary Ledger Archive and Daily Summaries
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.connection import ConnectionManager
+
+LEDGER_RECENT_DAYS = 7              # default window of get_disciplinary_records
+LEDGER_RETENTION_DAYS = 30          # older resolved entries move to the archive
+LEDGER_RESOLVED_GRACE_DAYS = 1      # resolved entries move this long after resolution
+LEDGER_ARCHIVE_INTERVAL_SECONDS = 3600.0
+
+LEDGER_COLUMNS = ("id", "task_id", "error_type", "error_message", "root_cause",
+                  "correction_action", "resolved", "resolved_at", "created_at")
+
+# Rows due for the archive, relative to :now (an SQLite time value). Open
+# entries stay live whatever their age, so they can still be resolved.
+_ARCHIVE_DUE = '''
+    resolved = 1 AND (created_at < datetime(:now, :retention) OR resolved_at < datetime(:now, :grace))
+'''
+ARCHIVE_DUE_SQL = f"SELECT {', '.join(LEDGER_COLUMNS)} FROM main.disciplinary_ledger WHERE {_ARCHIVE_DUE}"
+
+
+def archive_path_for(db_path: Path) -> Path:
+    return db_path.with_name(f"{db_path.stem}_archive{db_path.suffix}")
+
+
+def archive_params(now: str = "now", retention_days: int = LEDGER_RETENTION_DAYS,
+                   grace_days: int = LEDGER_RESOLVED_GRACE_DAYS) -> Dict[str, str]:
+    """Parameters of ARCHIVE_DUE_SQL."""
+    return {"now": now, "retention": f"-{retention_days} days", "grace": f"-{grace_days} days"}
+
+
+def records_query(task_id: Optional[int] = None, days: Optional[int] = LEDGER_RECENT_DAYS,
+                  include_archive: bool = False) -> Tuple[str, list]:
+    """SQL and parameters of LedgerArchive.records (the archive must be attached for include_archive)."""
+    where, params = [], []
+    if task_id:
+        where.append("task_id = ?")
+        params.append(task_id)
+    if days is not None:
+        where.append("created_at >= datetime('now', ?)")
+        params.append(f"-{days} days")
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+    columns = ", ".join(LEDGER_COLUMNS)
+
+    sql = f"SELECT {columns}, 0 AS archived FROM main.disciplinary_ledger {clause}"
+    if include_archive:
+        sql += f" UNION ALL SELECT {columns}, 1 AS archived FROM archive.disciplinary_ledger {clause}"
+        params = params * 2
+    return sql + " ORDER BY created_at DESC, id DESC", params
+
+
+class LedgerArchive:
+    """
+    Moves old and resolved disciplinary_ledger rows into a separate archive
+    database, attached to the working connection as `archive`. Each move also
+    folds the rows into ledger_daily_summary (per day and root cause) in the
+    main database, so history stays countable after the rows leave.
+
+    Only resolved entries move; open ones stay in the live table until
+    resolved. WAL commits are atomic per database, not across attached
+    ones, so a move is two transactions: the copy into the archive commits
+    first, then the summary update and delete run on main, limited to rows
+    the archive already holds. The copy keeps the original ids and uses
+    INSERT OR IGNORE, so a move interrupted between the two is redone
+    without losing or double-counting rows.
+    """
+
+    def __init__(self, db: ConnectionManager, archive_path: Path,
+                 interval: float = LEDGER_ARCHIVE_INTERVAL_SECONDS):
+        self.db = db
+        self.archive_path = archive_path
+        self.interval = interval
+        self._archived_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def attach(self) -> sqlite3.Connection:
+        """Attach the archive to this thread's connection (outside any transaction)."""
+        conn = self.db.connection()
+        if any(row[1] == "archive" for row in conn.execute("PRAGMA database_list")):
+            return conn
+        conn.execute("ATTACH DATABASE ? AS archive", (str(self.archive_path),))
+        conn.execute("PRAGMA archive.journal_mode = WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive.disciplinary_ledger (
+                id INTEGER PRIMARY KEY,
+                task_id INTEGER,
+                error_type TEXT NOT NULL,
+                error_message TEXT,
+                root_cause TEXT,
+                correction_action TEXT,
+                resolved BOOLEAN DEFAULT 0,
+                resolved_at TIMESTAMP,
+                created_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_ledger_task ON disciplinary_ledger(task_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_ledger_created ON disciplinary_ledger(created_at)")
+        return conn
+
+    def maybe_archive(self):
+        """Archive at most once per interval; cheap to call on every ledger write."""
+        with self._lock:
+            now = time.monotonic()
+            if self._archived_at is not None and now - self._archived_at < self.interval:
+                return
+            self._archived_at = now
+        self.archive()
+
+    def archive(self, now: str = "now", retention_days: int = LEDGER_RETENTION_DAYS,
+                grace_days: int = LEDGER_RESOLVED_GRACE_DAYS) -> Dict[str, int]:
+        """Move due rows to the archive and fold them into the daily summary."""
+        params = archive_params(now, retention_days, grace_days)
+        self.attach()
+        # 1. Copy; commits the archive only
+        with self.db.transaction() as c:
+            c.execute(f'''
+                INSERT OR IGNORE INTO archive.disciplinary_ledger ({", ".join(LEDGER_COLUMNS)})
+                {ARCHIVE_DUE_SQL}
+            ''', params)
+        # 2. Summarize and delete what the archive now holds; commits main only
+        moved_rows = f"{_ARCHIVE_DUE} AND id IN (SELECT id FROM archive.disciplinary_ledger)"
+        with self.db.transaction() as c:
+            c.execute(f'''
+                INSERT INTO ledger_daily_summary (day, root_cause, entries, resolved)
+                SELECT date(created_at), COALESCE(root_cause, 'unknown'), COUNT(*), SUM(resolved)
+                FROM main.disciplinary_ledger WHERE {moved_rows}
+                GROUP BY 1, 2
+                ON CONFLICT(day, root_cause) DO UPDATE SET
+                    entries = entries + excluded.entries,
+                    resolved = resolved + excluded.resolved
+            ''', params)
+            c.execute(f"DELETE FROM main.disciplinary_ledger WHERE {moved_rows}", params)
+            moved = c.rowcount
+        return {"archived": moved}
+
+    def records(self, task_id: Optional[int] = None, days: Optional[int] = LEDGER_RECENT_DAYS,
+                include_archive: bool = False) -> List[Dict[str, Any]]:
+        """
+        Ledger rows, newest first. By default only the last `days` of live
+        rows; `days=None` drops the time filter and include_archive adds
+        archived rows.
+        """
+        if include_archive:
+            self.attach()
+        sql, params = records_query(task_id, days, include_archive)
+        with self.db.read() as c:
+            c.execute(sql, params)
+            return [dict(r) for r in c.fetchall()]
+
+    def summary(self, days: int = LEDGER_RETENTION_DAYS) -> List[Dict[str, Any]]:
+        """Per day and root cause entry counts over archived and live rows."""
+        since = f"-{days} days"
+        with self.db.read() as c:
+            c.execute('''
+                SELECT day, root_cause, SUM(entries) AS entries, SUM(resolved) AS resolved FROM (
+                    SELECT day, root_cause, entries, resolved
+                    FROM ledger_daily_summary WHERE day >= date('now', ?)
+                    UNION ALL
+                    SELECT date(created_at), COALESCE(root_cause, 'unknown'), COUNT(*), SUM(resolved)
+                    FROM disciplinary_ledger WHERE created_at >= date('now', ?)
+                    GROUP BY 1, 2
+                )
+                GROUP BY day, root_cause
+                ORDER BY day DESC, entries DESC
+            ''', (since, since))
+            return [dict(r) for r in c.fetchall()]
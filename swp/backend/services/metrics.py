@@ -0,0 +1,221 @@
+"""
+SWP Metrics
+Sovereign Workflow Protocol - Prometheus Text-Format Counters and Histograms
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond reads up to slow protocol checks
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "<unmatched>"     # one label for every 404, so scans can't explode the series count
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: Any, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: Any) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect plus two additions under a lock."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: Any):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues: Any) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        for labelvalues, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = _labels(self.labelnames, labelvalues, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_gauge(name: str, help_text: str, labelname: str, values: Dict[str, float]) -> List[str]:
+    """A gauge family computed at scrape time (e.g. from stats_counters)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for key, value in sorted(values.items()):
+        lines.append(f"{name}{_labels((labelname,), (key,))} {_number(value)}")
+    return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+HTTP_REQUESTS = METRICS.counter(
+    "swp_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = METRICS.histogram(
+    "swp_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+DB_LOCK_WAIT = METRICS.histogram(
+    "swp_db_lock_wait_seconds", "Wait for the SQLite writer lock (BEGIN IMMEDIATE) by engine method.", ("method",))
+DB_QUERY = METRICS.histogram(
+    "swp_db_query_seconds", "Time spent inside engine database blocks, excluding commit.", ("method", "kind"))
+DB_COMMIT = METRICS.histogram(
+    "swp_db_commit_seconds", "SQLite commit time by engine method.", ("method",))
+DB_EXECUTOR_WAIT = METRICS.histogram(
+    "swp_db_executor_wait_seconds", "Queue time before an async engine call reaches a DB thread.", ("pool",))
+HOOK_INVOCATIONS = METRICS.counter(
+    "swp_hook_invocations_total", "Nanobot hook invocations (pre_task, post_task, error, ...).", ("hook",))
+
+
+class DatabaseMetrics:
+    """ConnectionManager observer that feeds the swp_db_* histograms."""
+
+    def lock_wait(self, method: str, seconds: float):
+        DB_LOCK_WAIT.observe(seconds, method)
+
+    def query(self, method: str, kind: str, seconds: float):
+        DB_QUERY.observe(seconds, method, kind)
+
+    def commit(self, method: str, seconds: float):
+        DB_COMMIT.observe(seconds, method)
+
+
+DB_METRICS = DatabaseMetrics()
+
+
+def count_hook(hook: str, amount: int = 1):
+    """Called by the hooks/nanobot.py entry points only; engine methods are covered by swp_db_*."""
+    HOOK_INVOCATIONS.inc(hook, amount=amount)
+
+
+def timed_executor_call(pool: str, fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap an executor job so the time it waited in the queue is recorded."""
+    queued = time.perf_counter()
+
+    def run():
+        DB_EXECUTOR_WAIT.observe(time.perf_counter() - queued, pool)
+        return fn()
+    return run
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording swp_http_* per route template. The label
+    comes from scope["route"] after the app ran, so /api/tasks/7 and
+    /api/tasks/8 share one series; requests no route matched share one too.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            label = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_LATENCY.observe(elapsed, scope["method"], label)
+            HTTP_REQUESTS.inc(scope["method"], label, str(status["code"]))
+
+
+def render_metrics(stats: Optional[Dict[str, Any]] = None) -> str:
+    """Every registered metric, plus task and ledger gauges from get_stats() output."""
+    extra: List[str] = []
+    if stats is not None:
+        extra += render_gauge("swp_tasks", "Tasks by status (stats_counters).", "status", stats["tasks_by_status"])
+        extra += render_gauge("swp_ledger_entries", "Disciplinary ledger entries, open or resolved.",
+                              "state", stats["ledger"])
+    return METRICS.render(extra)
@@ -0,0 +1,183 @@
+"""
+SWP Pattern Time Series
+Sovereign Workflow Protocol - Rolling-Window Execution Pattern Aggregates
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from models.connection import ConnectionManager
+from models.sketch import bucket_key, merge, percentiles
+
+# (resolution, bucket seconds, how long buckets stay at this resolution)
+# Older buckets are rolled into the next resolution; the last one expires.
+RESOLUTIONS = (
+    ("minute", 60, 2 * 3600),
+    ("hour", 3600, 2 * 86400),
+    ("day", 86400, 90 * 86400),
+)
+ROLLUP_INTERVAL_SECONDS = 60.0
+WINDOW_MAX_SECONDS = RESOLUTIONS[-1][2]
+
+WINDOW_SQL = '''
+    SELECT execution_count, success_count, total_minutes, duration_sketch
+    FROM execution_pattern_buckets
+    WHERE pattern_type = ? AND bucket_start >= ?
+'''
+# Buckets of one resolution that have aged out (rollup)
+AGED_BUCKETS_SQL = '''
+    SELECT pattern_type, bucket_start, execution_count, success_count, total_minutes, duration_sketch
+    FROM execution_pattern_buckets WHERE resolution = ? AND bucket_start < ?
+'''
+
+_WINDOW = re.compile(r"^(\d+)([mhd])$")
+_WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def parse_window(window: str) -> int:
+    """'15m' / '1h' / '24h' / '7d' -> seconds; ValueError for anything else."""
+    match = _WINDOW.match(window.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid window {window!r}; use e.g. 1h, 24h or 7d")
+    seconds = int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+    if not 0 < seconds <= WINDOW_MAX_SECONDS:
+        raise ValueError(f"Window must be between 1m and {WINDOW_MAX_SECONDS // 86400}d")
+    return seconds
+
+
+class PatternSeries:
+    """
+    Per-pattern aggregates in time buckets (execution_pattern_buckets).
+
+    record() adds to the current minute bucket. rollup() folds minute buckets
+    into hours and hours into days once they age out, and drops expired days,
+    so every execution is counted in exactly one bucket at any time and a
+    window is a single range read across resolutions. Windows are exact to
+    the coarsest bucket they touch.
+    """
+
+    def __init__(self, db: ConnectionManager, rollup_interval: float = ROLLUP_INTERVAL_SECONDS):
+        self.db = db
+        self.rollup_interval = rollup_interval
+        self._rolled_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def record(c: sqlite3.Cursor, pattern_type: str, duration_minutes: float, success: bool,
+               now: float):
+        """Add one execution to its minute bucket, within the caller's transaction."""
+        bucket = bucket_key(duration_minutes)
+        c.execute('''
+            INSERT INTO execution_pattern_buckets (
+                pattern_type, bucket_start, resolution,
+                execution_count, success_count, total_minutes, duration_sketch
+            )
+            VALUES (:type, :start, 'minute', 1, :success, :duration, json_object(:bucket, 1))
+            ON CONFLICT(pattern_type, bucket_start, resolution) DO UPDATE SET
+                execution_count = execution_count + 1,
+                success_count = success_count + :success,
+                total_minutes = total_minutes + :duration,
+                duration_sketch = json_set(
+                    duration_sketch, :path, COALESCE(json_extract(duration_sketch, :path), 0) + 1
+                )
+        ''', {
+            "type": pattern_type,
+            "start": int(now) // 60 * 60,
+            "success": 1 if success else 0,
+            "duration": duration_minutes,
+            "bucket": bucket,
+            "path": f'$."{bucket}"',
+        })
+
+    def maybe_rollup(self):
+        """Roll up at most once per interval; cheap to call on every write."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._rolled_at < self.rollup_interval:
+                return
+            self._rolled_at = now
+        self.rollup()
+
+    def rollup(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self.db.transaction() as c:
+            for (resolution, _, keep), (coarser, coarser_seconds, _) in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+                # Only whole coarser buckets move, so each is written once
+                cutoff = int(now - keep) // coarser_seconds * coarser_seconds
+                self._fold(c, resolution, coarser, coarser_seconds, cutoff)
+            last, _, keep = RESOLUTIONS[-1]
+            c.execute(
+                "DELETE FROM execution_pattern_buckets WHERE resolution = ? AND bucket_start < ?",
+                (last, int(now - keep))
+            )
+
+    @staticmethod
+    def _fold(c: sqlite3.Cursor, resolution: str, coarser: str, coarser_seconds: int, cutoff: int):
+        c.execute(AGED_BUCKETS_SQL, (resolution, cutoff))
+        rows = c.fetchall()
+        if not rows:
+            return
+
+        folded: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            key = (row["pattern_type"], row["bucket_start"] // coarser_seconds * coarser_seconds)
+            agg = folded.setdefault(key, {"count": 0, "successes": 0, "minutes": 0.0, "sketches": []})
+            agg["count"] += row["execution_count"]
+            agg["successes"] += row["success_count"]
+            agg["minutes"] += row["total_minutes"]
+            agg["sketches"].append(json.loads(row["duration_sketch"]))
+
+        for (pattern_type, start), agg in folded.items():
+            c.execute('''
+                SELECT execution_count, success_count, total_minutes, duration_sketch
+                FROM execution_pattern_buckets
+                WHERE pattern_type = ? AND bucket_start = ? AND resolution = ?
+            ''', (pattern_type, start, coarser))
+            existing = c.fetchone()
+            if existing:
+                agg["count"] += existing["execution_count"]
+                agg["successes"] += existing["success_count"]
+                agg["minutes"] += existing["total_minutes"]
+                agg["sketches"].append(json.loads(existing["duration_sketch"]))
+            c.execute('''
+                INSERT OR REPLACE INTO execution_pattern_buckets (
+                    pattern_type, bucket_start, resolution,
+                    execution_count, success_count, total_minutes, duration_sketch
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (pattern_type, start, coarser, agg["count"], agg["successes"], agg["minutes"],
+                  json.dumps(merge(agg["sketches"]))))
+
+        c.execute(
+            "DELETE FROM execution_pattern_buckets WHERE resolution = ? AND bucket_start < ?",
+            (resolution, cutoff)
+        )
+
+    def window_stats(self, pattern_type: str, window: str, now: Optional[float] = None) -> Optional[Dict]:
+        """Aggregate the last `window` of executions; None if there were none."""
+        seconds = parse_window(window)
+        now = time.time() if now is None else now
+        with self.db.read() as c:
+            c.execute(WINDOW_SQL, (pattern_type, int(now - seconds)))
+            rows = c.fetchall()
+
+        count = sum(r["execution_count"] for r in rows)
+        if not count:
+            return None
+        successes = sum(r["success_count"] for r in rows)
+        stats = {
+            "pattern_type": pattern_type,
+            "window": window,
+            "execution_count": count,
+            "success_count": successes,
+            "success_rate": successes / count,
+            "avg_duration_minutes": sum(r["total_minutes"] for r in rows) / count,
+        }
+        sketch = merge(json.loads(r["duration_sketch"]) for r in rows)
+        for name, value in percentiles(sketch).items():
+            stats[f"{name}_duration_minutes"] = value
+        return stats
@@ -0,0 +1,208 @@
+"""
+SWP Verification Protocol Runner
+Sovereign Workflow Protocol - Parallel Triple-Check Against Sources of Truth
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+PROTOCOL_WORKERS = 8
+PROTOCOL_TIMEOUT_SECONDS = 2.0      # default per-check deadline
+PROTOCOL_CACHE_TTL_SECONDS = 30.0   # the same file / endpoint is checked by many tasks
+PROTOCOL_CACHE_MAX = 1024
+
+# Protocols that establish facts vs. ones that establish paths
+FACT_METHODS = {"file_read", "curl_health"}
+PATH_METHODS = {"ls_check"}
+
+# method name -> fn(protocol, target) -> (ok, detail)
+VERIFIERS: Dict[str, Callable[[Dict[str, Any], str], Tuple[bool, str]]] = {}
+
+
+def register_verifier(method: str):
+    """Register the check behind a protocol `method`; later registrations win."""
+    def decorator(fn):
+        VERIFIERS[method] = fn
+        return fn
+    return decorator
+
+
+def _has_api_key(value: Any) -> bool:
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            normalized = key.lower().replace("-", "_")
+            if normalized in ("api_key", "apikey") and isinstance(inner, str) and inner.strip():
+                return True
+            if _has_api_key(inner):
+                return True
+    elif isinstance(value, list):
+        return any(_has_api_key(v) for v in value)
+    return False
+
+
+@register_verifier("file_read")
+def _verify_file_read(protocol: Dict[str, Any], target: str) -> Tuple[bool, str]:
+    try:
+        config = json.loads(Path(target).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False, f"{target} not found"
+    except (OSError, ValueError) as e:
+        return False, f"{target} unreadable: {e}"
+    if _has_api_key(config):
+        return True, f"API key present in {target}"
+    return False, f"No API key in {target}"
+
+
+@register_verifier("ls_check")
+def _verify_ls_check(protocol: Dict[str, Any], target: str) -> Tuple[bool, str]:
+    if Path(target).exists():
+        return True, f"{target} exists"
+    return False, f"{target} does not exist"
+
+
+@register_verifier("curl_health")
+def _verify_curl_health(protocol: Dict[str, Any], target: str) -> Tuple[bool, str]:
+    timeout = protocol.get("timeout", PROTOCOL_TIMEOUT_SECONDS)
+    try:
+        with urllib.request.urlopen(target, timeout=timeout) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        return False, f"{target} unreachable: {e}"
+    return 200 <= status < 300, f"{target} returned HTTP {status}"
+
+
+def target_allowed(protocol: Dict[str, Any], target: str) -> bool:
+    """
+    Whether an untrusted caller may check `target`: the protocol's
+    source_of_truth, or anything under one of its `allowed_targets`
+    (a directory for file checks, a URL prefix on the same scheme and
+    host for HTTP checks).
+    """
+    if target == protocol.get("source_of_truth"):
+        return True
+    for allowed in protocol.get("allowed_targets", ()):
+        if protocol["method"] == "curl_health":
+            want, got = urllib.parse.urlsplit(allowed), urllib.parse.urlsplit(target)
+            if (got.scheme, got.netloc) == (want.scheme, want.netloc) and got.path.startswith(want.path):
+                return True
+        elif Path(target).resolve().is_relative_to(Path(allowed).resolve()):
+            return True
+    return False
+
+
+class ProtocolRunner:
+    """
+    Runs verification protocols concurrently with per-check deadlines.
+
+    Results are cached per (method, target) for a short TTL. A check that is
+    still running is shared rather than started twice, so a burst of tasks
+    touching the same endpoint costs one request.
+    """
+
+    def __init__(self, protocols: Dict[str, Dict[str, Any]], workers: int = PROTOCOL_WORKERS,
+                 ttl: float = PROTOCOL_CACHE_TTL_SECONDS):
+        self.protocols = protocols
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="swp-verify")
+        self._cache: Dict[Tuple[str, str], Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, method: str, protocol: Dict[str, Any], target: str) -> Future:
+        key = (method, target)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and (cached[0] > now or not cached[1].done()):
+                return cached[1]
+            future = self._executor.submit(VERIFIERS[method], protocol, target)
+            self._cache[key] = (now + self.ttl, future)
+            if len(self._cache) > PROTOCOL_CACHE_MAX:
+                self._evict(now)
+        return future
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the oldest ones if still over the cap."""
+        for key in [k for k, (expires, f) in self._cache.items() if expires <= now and f.done()]:
+            del self._cache[key]
+        overflow = len(self._cache) - PROTOCOL_CACHE_MAX
+        if overflow > 0:
+            for key in sorted(self._cache, key=lambda k: self._cache[k][0])[:overflow]:
+                del self._cache[key]
+
+    def plan(self, targets: Dict[str, List[str]], restricted: bool = False) -> List[Tuple[str, str]]:
+        """
+        Expand {protocol name: [targets]} into (protocol, target) checks.
+        An empty target list falls back to the protocol's source_of_truth.
+        With `restricted` (requests from outside the process), targets must
+        pass target_allowed(); raises PermissionError otherwise.
+        """
+        checks = []
+        for name, wanted in targets.items():
+            protocol = self.protocols.get(name)
+            if protocol is None:
+                raise ValueError(f"Unknown verification protocol: {name}")
+            if protocol["method"] not in VERIFIERS:
+                raise ValueError(f"No verifier registered for method: {protocol['method']}")
+            for target in list(wanted) or [protocol.get("source_of_truth")]:
+                if not target:
+                    raise ValueError(f"Protocol {name} needs a target")
+                if restricted and not target_allowed(protocol, target):
+                    raise PermissionError(f"Target not allowed for protocol {name}: {target}")
+                checks.append((name, target))
+        return checks
+
+    def run(self, checks: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Run every check at once; each waits at most its protocol's timeout."""
+        started = time.monotonic()
+        pending = []
+        for name, target in checks:
+            protocol = self.protocols[name]
+            future = self._submit(protocol["method"], protocol, target)
+            pending.append((name, target, protocol, future))
+
+        results = []
+        for name, target, protocol, future in pending:
+            timeout = protocol.get("timeout", PROTOCOL_TIMEOUT_SECONDS)
+            check = {"protocol": name, "target": target}
+            try:
+                ok, detail = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+                check.update(status="passed" if ok else "failed", detail=detail)
+            except FutureTimeout:
+                check.update(status="timeout", detail=f"No answer within {timeout}s")
+            except Exception as e:
+                check.update(status="failed", detail=f"{type(e).__name__}: {e}")
+            results.append(check)
+        return results
+
+    def summarize(self, checks: List[Dict[str, Any]], result) -> None:
+        """
+        Fill a VerificationResult from check outcomes:
+        - fact_checked / path_verified: every check of that kind ran and passed;
+        - confidence: verified if everything passed, inferred if nothing failed
+          but some checks timed out, unknown otherwise.
+        """
+        def all_passed(methods) -> bool:
+            relevant = [c for c in checks if self.protocols[c["protocol"]]["method"] in methods]
+            return bool(relevant) and all(c["status"] == "passed" for c in relevant)
+
+        result.fact_checked = all_passed(FACT_METHODS)
+        result.path_verified = all_passed(PATH_METHODS)
+        statuses = {c["status"] for c in checks}
+        if statuses == {"passed"}:
+            result.confidence = "verified"
+        elif "passed" in statuses and "failed" not in statuses:
+            result.confidence = "inferred"
+        else:
+            result.confidence = "unknown"
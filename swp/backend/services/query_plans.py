@@ -0,0 +1,79 @@
+"""
+SWP Query Plan Audit
+Sovereign Workflow Protocol - Index Coverage of the Hot Queries
+
+Usage (from swp/backend):
+    python -m services.query_plans      # audits SWP_DB_PATH, or the default database
+"""
+
+import sqlite3
+from typing import Any, List, Tuple
+
+from services.engine import (
+    EXECUTION_STATE_SQL, EXPIRED_LEASES_SQL, HEARTBEAT_DEADLINE_SECONDS, HEARTBEAT_DEADLINES, PATTERN_SQL,
+    SKILL_MANUALS_BY_CATEGORY_SQL, TASK_COLUMNS, TASK_LIST_BY_STATUS_SQL, TASK_LIST_SQL, TASK_SQL,
+    TIER1_SQL, TIER2_SQL, TIER3_DELETE_SQL, TIER3_SQL, reap_query, task_page_query,
+)
+from services.ledger import ARCHIVE_DUE_SQL, archive_params, records_query
+from services.pattern_series import AGED_BUCKETS_SQL, WINDOW_SQL
+from services.scheduler import AGING_RATE, PENDING_COUNT_SQL, QUEUE_SQL, RUNNING_BY_CATEGORY_SQL
+
+_PAGE_KEY = ("2026-01-01 00:00:00", 1)
+_NOW = 1767225600.0       # 2026-01-01 UTC; only bound, never compared against data
+
+# (name, sql, params): the statements SWPEngine and its services run on every
+# request or claim, built from the same constants and query builders.
+HOT_QUERIES: List[Tuple[str, str, Any]] = [
+    ("get_task", TASK_SQL, (1,)),
+    ("list_tasks", TASK_LIST_SQL, ()),
+    ("list_tasks[status]", TASK_LIST_BY_STATUS_SQL, ("pending",)),
+    ("list_tasks_page", *task_page_query(TASK_COLUMNS)),
+    ("list_tasks_page[status]", *task_page_query(TASK_COLUMNS, "pending")),
+    ("list_tasks_page[cursor]", *task_page_query(TASK_COLUMNS, after=_PAGE_KEY)),
+    ("list_tasks_page[status, cursor]", *task_page_query(TASK_COLUMNS, "pending", _PAGE_KEY)),
+    ("tier1_plans", TIER1_SQL, (1,)),
+    ("tier2_context", TIER2_SQL, (1,)),
+    ("tier3_checklist", TIER3_SQL, (1,)),
+    ("tier3_delete", TIER3_DELETE_SQL, (1,)),
+    ("execution_state", EXECUTION_STATE_SQL, (1,)),
+    ("claim[expired_leases]", EXPIRED_LEASES_SQL, (_NOW,)),
+    ("claim[running_by_category]", RUNNING_BY_CATEGORY_SQL, ()),
+    ("claim[queue]", QUEUE_SQL, {"aging": AGING_RATE}),
+    ("queue[pending_count]", PENDING_COUNT_SQL, ()),
+    ("reap_stale_tasks", *reap_query(HEARTBEAT_DEADLINES, HEARTBEAT_DEADLINE_SECONDS, _NOW)),
+    ("ledger", *records_query(days=None)),
+    ("ledger[recent]", *records_query()),
+    ("ledger[task]", *records_query(task_id=1, days=None)),
+    ("ledger[task, recent]", *records_query(task_id=1)),
+    ("ledger_archive_due", ARCHIVE_DUE_SQL, archive_params()),
+    ("skill_manuals[category]", SKILL_MANUALS_BY_CATEGORY_SQL, ("backend",)),
+    ("execution_pattern", PATTERN_SQL, ("coding",)),
+    ("pattern_window", WINDOW_SQL, ("coding", 0)),
+    ("pattern_rollup", AGED_BUCKETS_SQL, ("minute", 0)),
+]
+
+
+def find_full_scans(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """Return (query name, plan detail) for every hot query that scans a table or sorts in a temp b-tree."""
+    offenders = []
+    for name, sql, params in HOT_QUERIES:
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall():
+            detail = row[-1]
+            full_scan = detail.startswith("SCAN") and "USING" not in detail
+            if full_scan or "TEMP B-TREE" in detail:
+                offenders.append((name, detail))
+    return offenders
+
+
+if __name__ == "__main__":
+    from models.database import DB_PATH, init_db
+
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    offenders = find_full_scans(conn)
+    conn.close()
+    for name, detail in offenders:
+        print(f"❌ {name}: {detail}")
+    if offenders:
+        raise SystemExit(1)
+    print(f"✅ All {len(HOT_QUERIES)} hot queries use indexes")
@@ -0,0 +1,180 @@
+"""
+SWP Root Cause Classifier
+Sovereign Workflow Protocol - Table-Driven Error Classification
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.connection import ConnectionManager
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:                # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+RCA_RULES_CHECK_SECONDS = 1.0      # how stale rules edited by another process may be
+RCA_PATTERN_MAX_LENGTH = 200       # rules are keyword alternations; anything longer is suspect
+UNKNOWN_ROOT_CAUSE = ("Unknown Error", "Review logs for details")
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+            getattr(sre_constants, "POSSESSIVE_REPEAT", sre_constants.MAX_REPEAT)}
+
+
+def _has_nested_repeat(parsed, repeated: bool) -> bool:
+    """True if a repeat in `parsed` wraps another repeat or a branch."""
+    for op, av in parsed:
+        if op in _REPEATS:
+            if repeated or _has_nested_repeat(av[2], repeated=True):
+                return True
+        elif op is sre_constants.BRANCH:
+            if repeated or any(_has_nested_repeat(b, repeated) for b in av[1]):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _has_nested_repeat(av[3], repeated):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _has_nested_repeat(av[1], repeated):
+                return True
+    return False
+
+
+class RCAClassifier:
+    """
+    Assigns a root cause to an error message from the `rca_rules` table.
+
+    All enabled rules are compiled into one regex of zero-width lookaheads,
+    one named group per rule in priority order, so a single scan of the
+    message sees every rule that matches anywhere in it. The lowest priority
+    number wins, the same as walking the rules top to bottom. Rules are
+    reloaded when the `rca_rules` cache generation changes.
+    """
+
+    def __init__(self, db: ConnectionManager, check_interval: float = RCA_RULES_CHECK_SECONDS):
+        self.db = db
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        # (combined pattern, outcome per group), swapped as one reference
+        self._compiled: Tuple[Optional[re.Pattern], List[Tuple[str, str]]] = (None, [])
+
+    def _read_generation(self) -> int:
+        with self.db.read() as c:
+            c.execute("SELECT generation FROM cache_generations WHERE name = 'rca_rules'")
+            row = c.fetchone()
+        return row["generation"] if row else 0
+
+    def _load(self):
+        with self.db.read() as c:
+            c.execute('''
+                SELECT id, pattern, root_cause, correction_action FROM rca_rules
+                WHERE enabled = 1 ORDER BY priority, id
+            ''')
+            rules = c.fetchall()
+
+        patterns, outcomes = [], []
+        for rule in rules:
+            try:
+                self.validate_pattern(rule["pattern"])
+            except ValueError as e:
+                print(f"⚠️ Skipping RCA rule #{rule['id']}: {e}")
+                continue
+            patterns.append(rule["pattern"])
+            outcomes.append((rule["root_cause"], rule["correction_action"] or ""))
+
+        try:
+            pattern = self.combine(patterns)
+        except re.error as e:
+            # Keep classifying with the last good rule set rather than failing every RCA
+            print(f"⚠️ RCA rules do not compile together, keeping the previous set: {e}")
+            return
+        self._compiled = (pattern, outcomes)
+
+    @staticmethod
+    def combine(patterns: List[str]) -> Optional[re.Pattern]:
+        """One regex for all rules: a lookahead alternative per rule, named r0..rN in order."""
+        if not patterns:
+            return None
+        branches = [f"(?P<r{i}>{p})" for i, p in enumerate(patterns)]
+        return re.compile(f"(?=(?:{'|'.join(branches)}))", re.IGNORECASE)
+
+    def _rules(self) -> Tuple[Optional[re.Pattern], List[Tuple[str, str]]]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            generation = self._read_generation()
+            with self._lock:
+                if generation != self._generation:
+                    self._load()
+                    self._generation = generation
+                self._checked_at = now
+        return self._compiled
+
+    def invalidate(self):
+        """Force a reload on the next classification."""
+        with self._lock:
+            self._generation = None
+            self._checked_at = 0.0
+
+    def classify(self, error_message: str) -> Tuple[str, str]:
+        """Return (root_cause, correction_action) for one message."""
+        pattern, outcomes = self._rules()
+        if pattern is None or not error_message:
+            return UNKNOWN_ROOT_CAUSE
+        best = None
+        for match in pattern.finditer(error_message):
+            # Alternatives are tried in priority order, so this is the best rule at this position
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return outcomes[best] if best is not None else UNKNOWN_ROOT_CAUSE
+
+    def classify_many(self, error_messages: List[str]) -> List[Tuple[str, str]]:
+        return [self.classify(m) for m in error_messages]
+
+    @staticmethod
+    def validate_pattern(pattern: str):
+        """
+        Raise ValueError for a pattern that would not compile, or that has
+        capturing groups: those would clash with the generated group names,
+        and numbered backreferences would point at another rule's group.
+
+        Rules can be added over the API and every RCA runs them on the
+        writer thread, so patterns are also capped in length and may not
+        repeat a group that itself repeats or alternates (`(?:x+x+)+`,
+        `(?:a|aa)*`): those backtrack exponentially on a near miss.
+        """
+        if len(pattern) > RCA_PATTERN_MAX_LENGTH:
+            raise ValueError(f"Invalid RCA pattern: longer than {RCA_PATTERN_MAX_LENGTH} characters")
+        try:
+            compiled = re.compile(f"(?:{pattern})")
+        except re.error as e:
+            raise ValueError(f"Invalid RCA pattern: {e}")
+        if compiled.groups:
+            raise ValueError("Invalid RCA pattern: capturing groups and backreferences are not allowed; "
+                             "use (?:...) for grouping")
+        if _has_nested_repeat(sre_parse.parse(pattern), repeated=False):
+            raise ValueError("Invalid RCA pattern: a repeated group may not contain "
+                             "another repeat or an alternation")
+
+    @classmethod
+    def validate_with_rules(cls, c: sqlite3.Cursor, pattern: str):
+        """Raise ValueError unless `pattern` also compiles combined with the enabled rules."""
+        cls.validate_pattern(pattern)
+        c.execute("SELECT pattern FROM rca_rules WHERE enabled = 1 ORDER BY priority, id")
+        patterns = [row["pattern"] for row in c.fetchall()]
+        try:
+            cls.combine(patterns + [pattern])
+        except re.error as e:
+            raise ValueError(f"Invalid RCA pattern alongside the existing rules: {e}")
+
+    def rules(self) -> List[Dict[str, Any]]:
+        with self.db.read() as c:
+            c.execute("SELECT * FROM rca_rules ORDER BY priority, id")
+            return [dict(row) for row in c.fetchall()]
@@ -0,0 +1,58 @@
+"""
+SWP Heartbeat Reaper
+Sovereign Workflow Protocol - Requeue Tasks Whose Runner Went Silent
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from services.engine import SWPEngine, get_engine, HEARTBEAT_DEADLINE_SECONDS
+
+REAPER_INTERVAL_SECONDS = 30.0
+
+
+class HeartbeatReaper:
+    """
+    Background thread that periodically calls reap_stale_tasks. Running one
+    per process is safe: each pass is a single write transaction, and a task
+    that another process already requeued no longer matches.
+    """
+
+    def __init__(self, engine: Optional[SWPEngine] = None, interval: float = REAPER_INTERVAL_SECONDS,
+                 deadlines: Optional[Dict[str, float]] = None,
+                 default_deadline: float = HEARTBEAT_DEADLINE_SECONDS):
+        self.engine = engine or get_engine()
+        self.interval = interval
+        self.deadlines = deadlines
+        self.default_deadline = default_deadline
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reaped = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="swp-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reap(self) -> List[int]:
+        reaped = self.engine.reap_stale_tasks(self.deadlines, self.default_deadline)
+        self.reaped += len(reaped)
+        return reaped
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                reaped = self.reap()
+            except Exception as e:
+                print(f"⚠️ Heartbeat reaper pass failed, will retry: {e}")
+                continue
+            if reaped:
+                print(f"♻️ Requeued {len(reaped)} stale task(s): {reaped}")
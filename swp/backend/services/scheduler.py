@@ -0,0 +1,160 @@
+"""
+SWP Task Scheduler
+Sovereign Workflow Protocol - Shortest-Expected-Job-First with Aging and Caps
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from models.connection import ConnectionManager
+
+DEFAULT_EXPECTED_MINUTES = 10.0     # estimate for categories with no history
+ESTIMATE_PRIOR_WEIGHT = 3           # runs of history needed before the mean dominates the default
+AGING_RATE = 0.5                    # each minute waited takes this many minutes off a task's estimate
+QUEUE_VIEW_LIMIT = 50
+RESCORE_THRESHOLD_MINUTES = 1.0     # estimate drift that re-scores a category's pending tasks
+
+# Minutes since the Unix epoch of a SQLite timestamp
+EPOCH_MINUTES_SQL = "((julianday({}) - 2440587.5) * 1440)"
+
+# A task's category is the first of its intent_keywords (INTENT_KEYWORDS order)
+CATEGORY_SQL = '''
+    CASE
+        WHEN intent_keywords IS NULL OR intent_keywords = '' THEN 'general'
+        WHEN instr(intent_keywords, ',') > 0 THEN substr(intent_keywords, 1, instr(intent_keywords, ',') - 1)
+        ELSE intent_keywords
+    END
+'''
+
+# Pending tasks in claim order (see TaskScheduler), with the scores behind it; binds :aging
+QUEUE_SQL = f'''
+    SELECT id, title, {CATEGORY_SQL} AS category, created_at,
+           queue_score - :aging * {EPOCH_MINUTES_SQL.format("created_at")} AS expected_minutes,
+           (julianday('now') - julianday(created_at)) * 1440 AS waited_minutes,
+           queue_score - :aging * {EPOCH_MINUTES_SQL.format("'now'")} AS score
+    FROM tasks WHERE status = 'pending'
+    ORDER BY queue_score, id
+'''
+RUNNING_BY_CATEGORY_SQL = f"SELECT {CATEGORY_SQL} AS category, COUNT(*) AS n FROM tasks WHERE status = 'running' GROUP BY 1"
+PENDING_COUNT_SQL = "SELECT COUNT(*) FROM tasks WHERE status = 'pending'"
+
+
+def task_category(intent_keywords: Optional[str]) -> str:
+    """Python twin of CATEGORY_SQL."""
+    return (intent_keywords or "").split(",")[0] or "general"
+
+
+class TaskScheduler:
+    """
+    Orders the pending queue by expected duration, shortest first.
+
+    A category's estimate is its execution_patterns mean, blended with
+    DEFAULT_EXPECTED_MINUTES until it has a few runs behind it. Waiting time
+    lowers the score (aging), so long tasks are delayed but never starved.
+    Categories can be capped at a number of concurrently running tasks;
+    capped tasks keep their place in the queue and are skipped at claim time.
+
+    expected - aging * waited orders tasks the same as
+    expected + aging * created_at, which does not change while a task waits.
+    That is stored as tasks.queue_score when a task is inserted, so a claim
+    reads the head of idx_tasks_queue instead of sorting the whole queue.
+    Scores use the estimate a category was last scored with; once its live
+    estimate is RESCORE_THRESHOLD_MINUTES away from that, its pending tasks
+    are re-scored.
+    """
+
+    def __init__(self, db: ConnectionManager, category_caps: Optional[Dict[str, int]] = None,
+                 aging_rate: float = AGING_RATE, default_minutes: float = DEFAULT_EXPECTED_MINUTES):
+        self.db = db
+        self.category_caps = dict(category_caps or {})
+        self.aging_rate = aging_rate
+        self.default_minutes = default_minutes
+        with self.db.transaction() as c:
+            # History recorded before v14 (or by an older process) not reflected in scores yet
+            c.execute("SELECT pattern_type, avg_duration_minutes, execution_count, scored_minutes FROM execution_patterns")
+            for row in c.fetchall():
+                self.refresh_estimate(c, *row)
+            # Rows written without a score (pre-v12 databases, bulk imports)
+            self._score(c, "status = 'pending' AND queue_score IS NULL", {})
+
+    def expected_minutes(self, avg_minutes: Optional[float], runs: int) -> float:
+        """Blend of the category's mean duration and default_minutes."""
+        return ((avg_minutes or 0.0) * runs + self.default_minutes * ESTIMATE_PRIOR_WEIGHT) / (runs + ESTIMATE_PRIOR_WEIGHT)
+
+    def score_sql(self, category: str, created: str) -> str:
+        """
+        queue_score as an SQL expression over a category and a creation-time
+        expression. INSERT INTO tasks uses score_sql("?", "CURRENT_TIMESTAMP"),
+        which is the same instant as the created_at default.
+        """
+        return f'''COALESCE(
+            (SELECT scored_minutes FROM execution_patterns WHERE pattern_type = {category}), {float(self.default_minutes)!r}
+        ) + {float(self.aging_rate)!r} * {EPOCH_MINUTES_SQL.format(created)}'''
+
+    def _score(self, c: sqlite3.Cursor, where: str, params: Dict[str, Any]):
+        c.execute(f"UPDATE tasks SET queue_score = {self.score_sql(CATEGORY_SQL, 'created_at')} WHERE {where}", params)
+
+    def refresh_estimate(self, c: sqlite3.Cursor, category: str, avg_minutes: Optional[float], runs: int,
+                         scored_minutes: Optional[float]):
+        """
+        Re-score `category`'s pending tasks once its estimate is
+        RESCORE_THRESHOLD_MINUTES or more away from the one they were scored
+        with (execution_patterns.scored_minutes; NULL is the default).
+        """
+        expected = self.expected_minutes(avg_minutes, runs)
+        scored = self.default_minutes if scored_minutes is None else scored_minutes
+        if abs(expected - scored) < RESCORE_THRESHOLD_MINUTES:
+            return
+        c.execute("UPDATE execution_patterns SET scored_minutes = ? WHERE pattern_type = ?", (expected, category))
+        self._score(c, f"status = 'pending' AND {CATEGORY_SQL} = :category", {"category": category})
+
+    def _ordered(self, c: sqlite3.Cursor):
+        """Pending tasks, best first, as a lazy cursor."""
+        c.execute(QUEUE_SQL, {"aging": self.aging_rate})
+        return c
+
+    @staticmethod
+    def running_by_category(c: sqlite3.Cursor) -> Dict[str, int]:
+        c.execute(RUNNING_BY_CATEGORY_SQL)
+        return {r["category"]: r["n"] for r in c.fetchall()}
+
+    def _has_room(self, category: str, running: Dict[str, int]) -> bool:
+        cap = self.category_caps.get(category)
+        return cap is None or running.get(category, 0) < cap
+
+    def pick(self, c: sqlite3.Cursor, limit: int) -> List[int]:
+        """Ids of the next `limit` tasks to run, within the caller's (write) transaction."""
+        running = self.running_by_category(c)
+        picked = []
+        for row in self._ordered(c):
+            if len(picked) >= limit:
+                break
+            if self._has_room(row["category"], running):
+                picked.append(row["id"])
+                running[row["category"]] = running.get(row["category"], 0) + 1
+        return picked
+
+    def queue(self, limit: int = QUEUE_VIEW_LIMIT) -> Dict[str, Any]:
+        """The head of the queue in run order, marking tasks held back by a cap."""
+        with self.db.snapshot():
+            with self.db.read() as c:
+                running = self.running_by_category(c)
+                c.execute(PENDING_COUNT_SQL)
+                pending = c.fetchone()[0]
+                rows = self._ordered(c).fetchmany(limit)
+
+        projected = dict(running)
+        items = []
+        for position, row in enumerate(rows, 1):
+            item = dict(row)
+            item["position"] = position
+            item["capped"] = not self._has_room(item["category"], projected)
+            if not item["capped"]:
+                projected[item["category"]] = projected.get(item["category"], 0) + 1
+            items.append(item)
+        return {
+            "items": items,
+            "pending": pending,
+            "running_by_category": running,
+            "category_caps": self.category_caps,
+        }
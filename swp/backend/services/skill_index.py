@@ -0,0 +1,68 @@
+"""
+SWP Skill Index
+Sovereign Workflow Protocol - In-Memory BM25 Ranking of One Category's Manuals
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+SKILL_COLUMNS = ("name", "category", "content", "keywords")
+BM25_K1 = 1.2           # FTS5's bm25() constants
+BM25_B = 0.75
+BM25_MIN_IDF = 1e-6
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens, close to FTS5's unicode61 tokenizer."""
+    return re.findall(r"\w+", (text or "").lower())
+
+
+class SkillIndex:
+    """
+    The manuals of one category with their columns pre-tokenized, ranked
+    with the same BM25 formula and column weights as skill_manuals_fts.
+    Document frequencies are taken over the category, which is what the
+    pre-task hook searches within. Built once per category and kept in the
+    skill cache, so picking a manual for a task needs no database read.
+    """
+
+    def __init__(self, manuals: List[Dict[str, Any]], weights: Sequence[float]):
+        self.manuals = manuals
+        self.weights = tuple(weights)
+        self._columns = [[Counter(tokenize(m.get(col))) for col in SKILL_COLUMNS] for m in manuals]
+        self._lengths = [sum(sum(c.values()) for c in cols) for cols in self._columns]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        self._df: Counter = Counter()
+        for cols in self._columns:
+            self._df.update(set().union(*cols))
+
+    def best(self, terms: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Highest-scoring manual containing any of `terms`, with its (bm25-style, negative) score."""
+        top = self.top(terms, 1)
+        return top[0] if top else None
+
+    def top(self, terms: Sequence[str], k: int) -> List[Dict[str, Any]]:
+        """The `k` best manuals containing any of `terms`, best first, like an FTS5 ORDER BY bm25() LIMIT k."""
+        n = len(self.manuals)
+        scored = []
+        for i, cols in enumerate(self._columns):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[i] / self._avg_length) if self._avg_length else BM25_K1
+            score = 0.0
+            for term in terms:
+                freq = sum(w * col[term] for w, col in zip(self.weights, cols))
+                if not freq:
+                    continue
+                df = self._df[term]
+                idf = max(math.log((n - df + 0.5) / (df + 0.5)), BM25_MIN_IDF)
+                score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+            if score > 0:
+                scored.append((-score, i))
+        return [{**self.manuals[i], "score": score} for score, i in heapq.nsmallest(k, scored)]
+
+    def newest(self) -> Optional[Dict[str, Any]]:
+        if not self.manuals:
+            return None
+        return dict(max(self.manuals, key=lambda m: (m.get("updated_at") or "", m["id"])))
@@ -0,0 +1,140 @@
+"""
+SWP Execution State Buffer
+Sovereign Workflow Protocol - Write-Behind Coalescing for Step Heartbeats
+"""
+
+import atexit
+import itertools
+import threading
+from typing import Any, Dict, Optional
+
+from models.connection import ConnectionManager
+
+# Durability bound: on a crash, at most this much recent step progress is lost.
+# 0 writes every save through immediately.
+STATE_FLUSH_SECONDS = 1.0
+STATE_MAX_DIRTY = 1000          # flush early once this many tasks are waiting
+
+STATE_FIELDS = ("current_step", "step_index", "last_resume_point", "last_heartbeat")
+
+
+class ExecutionStateBuffer:
+    """
+    Keeps the latest execution state per task in memory and writes dirty
+    entries in one transaction per flush, so a task saving every step costs
+    one row write per interval instead of one commit per call.
+
+    Readers overlay buffered fields on the stored row. Every put() also bumps
+    an in-process sequence number for the task, which the task ETag includes
+    so conditional GETs see buffered changes before they reach the database.
+    A flushed task's sequence number is dropped with its entry: the flush
+    bumps the task's version, which changes the ETag on its own.
+    """
+
+    def __init__(self, db: ConnectionManager, flush_interval: float = STATE_FLUSH_SECONDS,
+                 max_dirty: int = STATE_MAX_DIRTY):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._seqs: Dict[int, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    def put(self, task_id: int, state: Dict[str, Any]):
+        with self._lock:
+            self._pending[task_id] = state
+            self._seqs[task_id] = next(self._counter)
+            dirty = len(self._pending)
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+        self._ensure_thread()
+        if dirty >= self.max_dirty:
+            self._wake.set()
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """Buffered state not yet flushed, if any."""
+        with self._lock:
+            state = self._pending.get(task_id)
+            return dict(state) if state else None
+
+    def seq(self, task_id: int) -> int:
+        return self._seqs.get(task_id, 0)
+
+    def flush(self) -> int:
+        """
+        Write every dirty entry in one transaction. Returns rows written.
+        Entries stay readable through get() until the commit succeeds, and
+        only those not saved again meanwhile are dropped afterwards.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+                seqs = {task_id: self._seqs[task_id] for task_id in batch}
+            if not batch:
+                return 0
+            with self.db.transaction() as c:
+                c.executemany('''
+                    INSERT INTO execution_state
+                    (task_id, current_step, step_index, last_resume_point, last_heartbeat)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(task_id) DO UPDATE SET
+                        current_step = excluded.current_step,
+                        step_index = excluded.step_index,
+                        last_resume_point = excluded.last_resume_point,
+                        last_heartbeat = excluded.last_heartbeat
+                ''', [(task_id, *(state[f] for f in STATE_FIELDS)) for task_id, state in batch.items()])
+                c.executemany("UPDATE tasks SET version = version + 1 WHERE id = ?",
+                              [(task_id,) for task_id in batch])
+            with self._lock:
+                for task_id, seq in seqs.items():
+                    if self._seqs.get(task_id) == seq:
+                        self._pending.pop(task_id, None)
+                        self._seqs.pop(task_id, None)
+            self.flushes += 1
+            self.rows_written += len(batch)
+            return len(batch)
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="swp-state-flush", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Execution state flush failed, will retry: {e}")
+
+    def close(self):
+        """Stop the flusher and write whatever is still buffered."""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            dirty = len(self._pending)
+        return {
+            "dirty": dirty,
+            "flush_interval": self.flush_interval,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
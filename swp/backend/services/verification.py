@@ -0,0 +1,125 @@
+"""
+SWP Output Verification
+Sovereign Workflow Protocol - Single-Pass, Bounded-Memory Output Checks
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+ERROR_INDICATORS = ["error", "failed", "exception", "traceback", "cannot", "unable"]
+MIN_OUTPUT_CHARS = 10       # stripped output shorter than this fails verification
+MIN_KEYWORD_OVERLAP = 3     # fewer shared words with the task description is a warning
+
+_WHITESPACE = re.compile(r"\s")
+
+
+class OutputVerifier:
+    """
+    Incremental version of the post-task checks. Feed output chunks in order;
+    only the current chunk, a short carry-over and the matched sets are held
+    in memory. feed() returns True once no further input can change the result,
+    so callers may stop reading.
+    """
+
+    def __init__(self, task_id: int, description: Optional[str]):
+        self.task_id = task_id
+        self.task_words = set(description.lower().split()) if description else set()
+        self.overlap = set()
+        self.found = set()
+        self.chars_seen = 0
+        self.stopped_early = False
+        self._first_text_pos: Optional[int] = None   # position of first non-whitespace char
+        self._long_enough = False
+        # A word split across chunks; None means "inside a word too long to match"
+        self._carry: Optional[str] = ""
+        self._max_word = max((len(w) for w in self.task_words), default=0)
+        # Indicators may also straddle chunks
+        self._tail = ""
+        self._tail_len = max(len(w) for w in ERROR_INDICATORS) - 1
+
+    @property
+    def decided(self) -> bool:
+        overlap_done = not self.task_words or len(self.overlap) >= MIN_KEYWORD_OVERLAP
+        return self._long_enough and overlap_done and len(self.found) == len(ERROR_INDICATORS)
+
+    def feed(self, chunk: str) -> bool:
+        if not chunk or self.decided:
+            return self.decided
+        lower = chunk.lower()
+
+        # Check 1: stripped length, tracked as first..last non-whitespace position
+        if not self._long_enough:
+            stripped = lower.lstrip()
+            if stripped and self._first_text_pos is None:
+                self._first_text_pos = self.chars_seen + len(lower) - len(stripped)
+            if stripped:
+                last_text_pos = self.chars_seen + len(lower.rstrip()) - 1
+                if last_text_pos - self._first_text_pos + 1 >= MIN_OUTPUT_CHARS:
+                    self._long_enough = True
+        self.chars_seen += len(lower)
+
+        # Check 2: word overlap with the description
+        if self.task_words and len(self.overlap) < MIN_KEYWORD_OVERLAP:
+            self._feed_words(lower)
+
+        # Check 3: error indicators, including ones split across chunks
+        if len(self.found) < len(ERROR_INDICATORS):
+            window = self._tail + lower
+            self.found.update(w for w in ERROR_INDICATORS if w not in self.found and w in window)
+            self._tail = window[-self._tail_len:]
+
+        if self.decided:
+            self.stopped_early = True
+        return self.decided
+
+    def _feed_words(self, lower: str):
+        if self._carry is None:
+            # Still inside an over-long word: skip to the next whitespace
+            boundary = _WHITESPACE.search(lower)
+            if not boundary:
+                return
+            text = lower[boundary.start():]
+        else:
+            text = self._carry + lower
+
+        words = text.split()
+        if text and not text[-1].isspace() and words:
+            last = words.pop()
+            self._carry = last if len(last) <= self._max_word else None
+        else:
+            self._carry = ""
+        self.overlap.update(self.task_words.intersection(words))
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the carried word and build the verification result."""
+        if self._carry and self.task_words and len(self.overlap) < MIN_KEYWORD_OVERLAP:
+            if self._carry in self.task_words:
+                self.overlap.add(self._carry)
+        self._carry = ""
+
+        results: Dict[str, Any] = {
+            "task_id": self.task_id,
+            "verified": True,
+            "warnings": [],
+            "errors": []
+        }
+
+        # Check 1: Is output empty?
+        if not self._long_enough:
+            results["verified"] = False
+            results["errors"].append("Output is empty or too short")
+
+        # Check 2: Does output match task description?
+        if self.task_words:
+            overlap = len(self.overlap)
+            if overlap < MIN_KEYWORD_OVERLAP:
+                results["warnings"].append(
+                    f"Low keyword overlap between task and output ({overlap} matches)"
+                )
+
+        # Check 3: Error indicators in output
+        found_errors: List[str] = [w for w in ERROR_INDICATORS if w in self.found]
+        if found_errors:
+            results["warnings"].append(f"Potential errors detected: {found_errors}")
+
+        return results
@@ -0,0 +1,157 @@
+"""
+SWP Task Worker Pool
+Sovereign Workflow Protocol - Lease-Based Task Execution
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Set
+
+from services.engine import SWPEngine, get_engine, LEASE_SECONDS
+from services.scheduler import task_category
+
+WORKER_CONCURRENCY = 4
+WORKER_POLL_SECONDS = 1.0       # idle wait between claims when the queue is empty
+
+# handler(task) -> output text; raising sends the task through RCA
+TaskHandler = Callable[[Dict[str, Any]], str]
+
+
+def default_owner() -> str:
+    """Lease owner id, unique per pool: host, process and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class TaskWorkerPool:
+    """
+    Runs pending tasks with `concurrency` worker threads.
+
+    Each worker claims one task at a time under a lease. A heartbeat thread
+    renews the leases of running tasks every third of the lease period. If a
+    process dies, its leases lapse and the tasks become claimable again. If a
+    renewal finds a lease gone, that task's result is discarded so it is never
+    finished twice.
+
+    A finished task is verified (the post-task hook); a handler exception
+    goes through RCA (the error hook). Either outcome is recorded in the same
+    transaction that releases the lease (complete_task). The run's duration
+    is recorded as an execution pattern of its category, which is what the
+    scheduler's estimates are built from.
+    """
+
+    def __init__(self, handler: TaskHandler, concurrency: int = WORKER_CONCURRENCY,
+                 engine: Optional[SWPEngine] = None, owner: Optional[str] = None,
+                 lease_seconds: float = LEASE_SECONDS, poll_interval: float = WORKER_POLL_SECONDS):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.engine = engine or get_engine()
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._workers_done = threading.Event()
+        self._threads = []
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._active: Set[int] = set()
+        self._lost: Set[int] = set()
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.abandoned = 0
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._workers_done.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._work, name=f"swp-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        # Keeps renewing until the last worker has finished its task
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="swp-worker-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop claiming; running tasks finish first (up to `timeout` each)."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._workers_done.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.engine.claim_tasks(self.owner, 1, self.lease_seconds)
+                if claimed:
+                    self.run_task(claimed[0])
+                    continue
+            except Exception as e:
+                # e.g. the store is locked past busy_timeout; an unfinished lease just lapses
+                print(f"⚠️ Worker {threading.current_thread().name} error, retrying: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def run_task(self, task: Dict[str, Any]):
+        """Run one claimed task to completion and hand its lease back."""
+        task_id = task["id"]
+        with self._lock:
+            self._active.add(task_id)
+        started = time.monotonic()
+        try:
+            output = self.handler(task)
+            error = None
+        except Exception as e:
+            output, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            elapsed_minutes = (time.monotonic() - started) / 60
+            with self._lock:
+                self._active.discard(task_id)
+                lost = task_id in self._lost
+                self._lost.discard(task_id)
+
+        # Only the current lease holder may finish the task; the lease goes in the same commit
+        if lost or self.engine.complete_task(task_id, self.owner, output, error) is None:
+            self._count("abandoned")
+            return
+        self._count("completed" if error is None else "failed")
+        self.engine.record_pattern(task_category(task["intent_keywords"]), elapsed_minutes,
+                                   error is None, [error] if error else [])
+
+    def _count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _heartbeat(self):
+        interval = self.lease_seconds / 3
+        while not self._workers_done.wait(interval):
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                lost = self.engine.renew_leases(self.owner, active, self.lease_seconds)
+            except Exception as e:
+                print(f"⚠️ Lease renewal failed, will retry: {e}")
+                continue
+            if lost:
+                with self._lock:
+                    self._lost.update(t for t in lost if t in self._active)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = len(self._active)
+        return {
+            "owner": self.owner,
+            "concurrency": self.concurrency,
+            "running": running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+        }
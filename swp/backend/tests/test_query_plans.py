@@ -0,0 +1,14 @@
+import sqlite3
+
+from models.database import init_db
+from services.query_plans import find_full_scans
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    db_path = tmp_path / "swp.db"
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        assert not find_full_scans(conn)
+    finally:
+        conn.close()